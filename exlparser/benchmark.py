@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 04:12:50 PM CET
+
+"""End-to-end benchmark of exchanger on synthetic calibration sheets.
+
+Sheets are generated row by row on demand, so that the memory of the sheet itself is not counted. Since .xls
+is limited to 65536 rows and no excel writer is available, opening the workbook is not part of the benchmark;
+everything after xlrd.open_workbook (validate_sheet, parse_sheet, gen_binary, gen_header) is.
+"""
+
+import sys
+import time
+import argparse
+import multiprocessing
+
+import xlrd
+from xlrd.sheet import Cell
+from exchanger import COLUMNS, parse_sheet, gen_binary, gen_header
+from checksums import new_checksum, DEFAULT_CHECKSUM
+from validation import ValidationError, validate_sheet
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Header group(key 0): [Calibration Name, Item length, value cell]
+HEADER_ROWS = [('CHECKSUM', 16, (xlrd.XL_CELL_NUMBER, 0.0)),
+               ('MODULE_ID', 16, (xlrd.XL_CELL_NUMBER, 7.0)),
+               ('HFI_Calibration', 16, (xlrd.XL_CELL_NUMBER, 22.0)),
+               ('PART_NUMBER', 32, (xlrd.XL_CELL_NUMBER, 12345678.0)),
+               ('DLS', 16, (xlrd.XL_CELL_TEXT, u'"AA"')),
+               ('CAL_FORM_ID', 16, (xlrd.XL_CELL_NUMBER, 0.0))]
+
+# Rows of one key group, a mix of 1-bit fields, numbers, hex texts and quoted strings
+KEY_ROWS = ([('ITEM_NUMBER_8', 8, (xlrd.XL_CELL_NUMBER, 28.0))] +
+            [('ITEM_BIT_%d' %i, 1, (xlrd.XL_CELL_NUMBER, float(i % 2))) for i in range(8)] +
+            [('ITEM_NUMBER_16', 16, (xlrd.XL_CELL_NUMBER, 1015.0)),
+             ('ITEM_HEX_8', 8, (xlrd.XL_CELL_TEXT, u'1E')),
+             ('ITEM_STRING_64', 64, (xlrd.XL_CELL_TEXT, u'"ABCDEF"')),
+             ('ITEM_NUMBER_32', 32, (xlrd.XL_CELL_NUMBER, 12345678.0)),
+             ('ITEM_HEX_16', 16, (xlrd.XL_CELL_TEXT, u'3C00'))] +
+            [('ITEM_FLAG_%d' %i, 1, (xlrd.XL_CELL_NUMBER, 1.0)) for i in range(8)])
+
+class SyntheticSheet(object):
+    """Calibration sheet with the layout exchanger expects, rows are generated on demand.
+
+    Row 0 is title, row 1 is column names, then the header group, then key groups, then the end row.
+    """
+
+    def __init__(self, rows):
+        """
+        :param rows: Number of calibration rows(approximately, rounded up to whole key groups).
+        """
+        self.key_count = max((rows - len(HEADER_ROWS) + len(KEY_ROWS) - 1) / len(KEY_ROWS), 1)
+        if self.key_count > 0xFFFF:
+            raise ValueError("Too many rows for 16-bit Key ID")
+        self.nrows = 2 + len(HEADER_ROWS) + self.key_count * len(KEY_ROWS) + 1
+        self.ncols = len(COLUMNS)
+
+    def row_values(self, rowx):
+        if rowx == 1:
+            return list(COLUMNS)
+        return [cell.value for cell in self.row(rowx)]
+
+    def col(self, colx):
+        return [Cell(xlrd.XL_CELL_EMPTY, '')] * self.nrows
+
+    def col_slice(self, colx, start_rowx=0, end_rowx=None):
+        if end_rowx is None:
+            end_rowx = self.nrows
+        return [self.row(rowx)[colx] for rowx in range(start_rowx, end_rowx)]
+
+    def col_values(self, colx, start_rowx=0, end_rowx=None):
+        return [cell.value for cell in self.col_slice(colx, start_rowx, end_rowx)]
+
+    def col_types(self, colx, start_rowx=0, end_rowx=None):
+        return [cell.ctype for cell in self.col_slice(colx, start_rowx, end_rowx)]
+
+    def row(self, rowx):
+        """
+        :param rowx: Row index.
+        :return: List of cells, in the order of COLUMNS.
+        """
+        index = rowx - 2
+        if index < 0 or rowx == self.nrows - 1:
+            return [Cell(xlrd.XL_CELL_EMPTY, '') for column in COLUMNS]
+        if index < len(HEADER_ROWS):
+            key, name = 0, ''
+            cali, length, value = HEADER_ROWS[index]
+        else:
+            key, index = divmod(index - len(HEADER_ROWS), len(KEY_ROWS))
+            key += 1
+            name = u'ERG_SYNTHETIC_KEY%d' %key
+            cali, length, value = KEY_ROWS[index]
+        return [Cell(xlrd.XL_CELL_TEXT, u'%04X' %key),
+                Cell(xlrd.XL_CELL_NUMBER, float(length)),
+                Cell(*value),
+                Cell(xlrd.XL_CELL_TEXT, unicode(cali)),
+                Cell(xlrd.XL_CELL_TEXT if name else xlrd.XL_CELL_EMPTY, name)]
+
+def peak_memory():
+    """
+    :return: Peak resident memory of current process in MB, None if unknown.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on Mac OS X, in KB on Linux
+    if sys.platform == 'darwin':
+        return peak / 1024.0 / 1024.0
+    return peak / 1024.0
+
+def run(rows):
+    """Run the pipeline once on a synthetic sheet, meant to be called in a fresh process.
+
+    :param rows: Number of calibration rows.
+    :return: Tuple of (number of rows, seconds, binary bytes, header bytes, peak memory in MB).
+    """
+    sheet = SyntheticSheet(rows)
+    start = time.time()
+    # Every sheet is validated before encoding, as convert_workbook() does
+    violations = validate_sheet(sheet, new_checksum(DEFAULT_CHECKSUM).size)
+    if violations:
+        raise ValidationError(violations)
+    model = parse_sheet(sheet)
+    bin_content = gen_binary(model.fragments)
+    header_content = gen_header(model.entries)
+    elapsed = time.time() - start
+    return model.rows, elapsed, len(bin_content), len(header_content), peak_memory()
+
+#-----------------------------------
+#               Main
+#-----------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark exchanger on synthetic calibration sheets.")
+    parser.add_argument("sizes", type=int, nargs="*", default=[1000, 10000, 100000, 1000000],
+                        help="Number of rows of each sheet (default: 1000 10000 100000 1000000)")
+    args = parser.parse_args()
+
+    print "%10s %10s %12s %12s %12s %10s" %("rows", "seconds", "rows/s", "bin bytes", "header bytes", "peak MB")
+    for size in args.sizes:
+        # Each size runs in a fresh process, so that peak memory is not inherited from the last size
+        pool = multiprocessing.Pool(1)
+        try:
+            rows, elapsed, bin_bytes, header_bytes, peak = pool.apply(run, (size,))
+        finally:
+            pool.close()
+            pool.join()
+        print "%10d %10.3f %12.0f %12d %12d %10s" %(rows, elapsed, rows / elapsed, bin_bytes, header_bytes,
+                                                   "%.1f" %peak if peak is not None else "n/a")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 05:02:33 PM CET
+
+class BitWriter(object):
+    """Pack bit fields of any width into a bytearray, most significant bit first.
+
+    Bits are shifted into an integer accumulator, every completed byte is appended to buffer right away.
+    """
+
+    def __init__(self, buf=None):
+        """
+        :param buf: bytearray to append to, a new one if None.
+        """
+        self.buffer = bytearray() if buf is None else buf
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value, width):
+        """Append the lowest width bits of value.
+
+        :param value: Non-negative integer.
+        :param width: Bit width.
+        :return: None
+
+        >>> w = BitWriter()
+        >>> w.write(5, 3); w.write(1, 1); w.write(0x3f, 6); w.write(0, 6)
+        >>> w.buffer
+        bytearray(b'\\xbf\\xc0')
+        """
+        if value < 0 or value >> width:
+            raise ValueError("Value %d is wider than %d bit(s)" %(value, width))
+        acc = (self._acc << width) | value
+        bits = self._bits + width
+        buf = self.buffer
+        while bits >= 8:
+            bits -= 8
+            buf.append((acc >> bits) & 0xFF)
+        self._acc = acc & ((1 << bits) - 1)
+        self._bits = bits
+        return None
+
+    def aligned(self):
+        """
+        :return: True if no pending bit, i.e. all written bits are in buffer.
+        """
+        return self._bits == 0
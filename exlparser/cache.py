@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 09:12:40 AM CET
+
+import os
+import time
+import hashlib
+
+BIN_SUFFIX = '.bin'
+HEADER_SUFFIX = '.h'
+NAMES_SUFFIX = '.names'
+DECODERS_SUFFIX = '.py'
+# Optional parts of an entry, in the order of put() arguments
+EXTRA_SUFFIXES = (NAMES_SUFFIX, DECODERS_SUFFIX)
+
+def cache_key(content, version, columns):
+    """Calculate cache key of an excel.
+
+    :param content: Content of the excel file.
+    :param version: Version of exchanger.
+    :param columns: Names of columns read by exchanger.
+    :return: Hex digest.
+    """
+    sha = hashlib.sha1()
+    sha.update(version)
+    sha.update('\x00'.join(columns))
+    sha.update('\x00')
+    sha.update(content)
+    return sha.hexdigest()
+
+class BuildCache(object):
+    """On-disk cache of binary content and header content of converted excels.
+
+    Each entry is stored as two files, <key>.bin and <key>.h, in cache directory, plus <key>.names and <key>.py
+    if key names and decoders are stored.
+    The mtime of the entry is refreshed on every hit, which is used for eviction.
+    """
+
+    def __init__(self, cache_dir, max_size=256*1024*1024, max_age=30*24*3600):
+        """
+        :param cache_dir: Directory storing cache entries.
+        :param max_size: Maximum total bytes of entries kept by evict().
+        :param max_age: Maximum seconds since last use of entries kept by evict().
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def get(self, key):
+        """Get cached entry.
+
+        :param key: Cache key.
+        :return: Tuple of (binary content, header content) followed by the stored extra contents, in the order of
+                 EXTRA_SUFFIXES, None if not cached.
+        """
+        try:
+            with open(self._path(key, BIN_SUFFIX), 'rb') as f:
+                bin_content = f.read()
+            with open(self._path(key, HEADER_SUFFIX), 'rb') as f:
+                header_content = f.read()
+            os.utime(self._path(key, BIN_SUFFIX), None)
+            os.utime(self._path(key, HEADER_SUFFIX), None)
+        except (IOError, OSError):
+            return None
+        result = (bin_content, header_content)
+        for suffix in EXTRA_SUFFIXES:
+            try:
+                with open(self._path(key, suffix), 'rb') as f:
+                    result += (f.read(),)
+            except IOError:
+                break
+        return result
+
+    def put(self, key, bin_content, header_content, *extra_contents):
+        """Store entry, files are renamed into place so that concurrent readers never see partial entry.
+
+        :param key: Cache key.
+        :param bin_content: Binary content.
+        :param header_content: Header content.
+        :param extra_contents: Key names content and decoders content, see EXTRA_SUFFIXES.
+        :return: None
+        """
+        if not os.path.isdir(self.cache_dir):
+            try:
+                os.makedirs(self.cache_dir)
+            except OSError:
+                if not os.path.isdir(self.cache_dir):
+                    raise
+        # Binary file is put last, since it marks an entry in evict()
+        contents = [(HEADER_SUFFIX, header_content), (BIN_SUFFIX, bin_content)]
+        contents[:0] = zip(EXTRA_SUFFIXES, extra_contents)
+        for suffix, content in contents:
+            path = self._path(key, suffix)
+            tmp_path = "%s.%d.tmp" %(path, os.getpid())
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tmp_path, path)
+        return None
+
+    def evict(self):
+        """Remove entries not used within max_age, then remove least recently used entries till total size
+        is not larger than max_size.
+
+        :return: Number of removed entries.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(BIN_SUFFIX):
+                continue
+            key = name[:-len(BIN_SUFFIX)]
+            try:
+                stat = os.stat(self._path(key, BIN_SUFFIX))
+                size = stat.st_size
+                for suffix in (HEADER_SUFFIX,) + EXTRA_SUFFIXES:
+                    if os.path.exists(self._path(key, suffix)):
+                        size += os.path.getsize(self._path(key, suffix))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, size, key))
+        # Least recently used first
+        entries.sort()
+        total_size = sum([entry[1] for entry in entries])
+        now = time.time()
+        count = 0
+        for mtime, size, key in entries:
+            if now - mtime <= self.max_age and total_size <= self.max_size:
+                break
+            for suffix in (BIN_SUFFIX, HEADER_SUFFIX) + EXTRA_SUFFIXES:
+                if os.path.exists(self._path(key, suffix)):
+                    os.remove(self._path(key, suffix))
+            total_size -= size
+            count += 1
+        return count
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 08:14:45 PM CET
+
+import struct
+import binascii
+import zlib
+
+BYTE = struct.Struct('>B')
+# Number of 16-bit words unpacked at once when summing
+CHUNK_WORDS = 4096
+CHUNK = struct.Struct('>%dH' %CHUNK_WORDS)
+BYTE_CHUNK = struct.Struct('>%dB' %(CHUNK_WORDS * 2))
+
+def sum16(buf, offset=0):
+    """Sum big-endian 16-bit words of buf from offset, reading buf in place. If byte count is odd, the last byte
+    is padded with '\\x00'.
+
+    :param buf: bytearray or memoryview.
+    :param offset: Start offset in buf.
+    :return: Sum(not truncated).
+
+    >>> sum16(bytearray('\\x00\\x12\\x34\\x77\\x88'), 1)
+    35260
+    """
+    end = len(buf)
+    total = 0
+    while end - offset >= CHUNK.size:
+        total += sum(CHUNK.unpack_from(buf, offset))
+        offset += CHUNK.size
+    word_count = (end - offset) / 2
+    if word_count:
+        total += sum(struct.unpack_from('>%dH' %word_count, buf, offset))
+        offset += word_count * 2
+    if offset < end:
+        total += BYTE.unpack_from(buf, offset)[0] << 8
+    return total
+
+def sum8(buf, offset=0):
+    """Sum bytes of buf from offset, reading buf in place.
+
+    :param buf: bytearray or memoryview.
+    :param offset: Start offset in buf.
+    :return: Sum.
+
+    >>> sum8(bytearray('\\x00\\x12\\x34\\x77\\x88'), 1)
+    325
+    """
+    end = len(buf)
+    total = 0
+    while end - offset >= BYTE_CHUNK.size:
+        total += sum(BYTE_CHUNK.unpack_from(buf, offset))
+        offset += BYTE_CHUNK.size
+    if offset < end:
+        total += sum(struct.unpack_from('>%dB' %(end - offset), buf, offset))
+    return total
+
+class Sum16(object):
+    """Accumulator of 16-bit two's complement checksum, fed with bytes chunk by chunk.
+
+    Sums of bytes at even and odd positions of the stream are kept apart, so a chunk may end in the middle of a
+    word, and accumulators of adjacent chunks built independently can be combined.
+    """
+    size = 2
+
+    def __init__(self):
+        self.count = 0
+        self.even = 0
+        self.odd = 0
+
+    def update(self, data):
+        """Feed bytes following the bytes fed so far.
+
+        :param data: bytearray, memoryview or string.
+        :return: None
+        """
+        if not isinstance(data, (bytearray, memoryview)):
+            data = bytearray(data)
+        length = len(data)
+        if length == 0:
+            return None
+        offset = 0
+        if self.count % 2 != 0:
+            # Carry: 1st byte is the low byte of the pending word
+            self.odd += BYTE.unpack_from(data, 0)[0]
+            offset = 1
+        words = sum16(data, offset)
+        total = sum8(data, offset)
+        # words = 256 * even + odd, total = even + odd
+        even = (words - total) / 255
+        self.even += even
+        self.odd += total - even
+        self.count += length
+        return None
+
+    def combine(self, other):
+        """Append the bytes fed to other accumulator to this one.
+
+        :param other: Sum16 of the bytes following the bytes fed to this one.
+        :return: self
+        """
+        if self.count % 2 == 0:
+            self.even += other.even
+            self.odd += other.odd
+        else:
+            self.even += other.odd
+            self.odd += other.even
+        self.count += other.count
+        return self
+
+    def state(self):
+        """
+        :return: Tuple of (count, even, odd), to rebuild the accumulator by from_state().
+        """
+        return self.count, self.even, self.odd
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        :param state: State made by state().
+        :return: Sum16 as if fed with the same bytes.
+        """
+        accumulator = cls()
+        accumulator.count, accumulator.even, accumulator.odd = state
+        return accumulator
+
+    def digest(self):
+        """
+        :return: Checksum, 16-bit two's complement of sum of words.
+        """
+        return -((self.even << 8) + self.odd) & 0xFFFF
+
+class Crc16Ccitt(object):
+    """Accumulator of CRC-16/CCITT(polynomial 0x1021, initial value 0xFFFF, not reflected).
+
+    The table-driven calculation is done by binascii.crc_hqx.
+    """
+    size = 2
+
+    def __init__(self):
+        self.count = 0
+        self.crc = 0xFFFF
+
+    def update(self, data):
+        """Feed bytes following the bytes fed so far.
+
+        :param data: bytearray, memoryview or string.
+        :return: None
+        """
+        self.crc = binascii.crc_hqx(data, self.crc)
+        self.count += len(data)
+        return None
+
+    def digest(self):
+        """
+        :return: CRC.
+        """
+        return self.crc
+
+class Crc32(object):
+    """Accumulator of CRC-32(as zlib, polynomial 0x04C11DB7 reflected).
+
+    The table-driven calculation is done by zlib.crc32, memoryview is copied to it in bounded slices.
+    """
+    size = 4
+    SLICE = 64 * 1024
+
+    def __init__(self):
+        self.count = 0
+        self.crc = 0
+
+    def update(self, data):
+        """Feed bytes following the bytes fed so far.
+
+        :param data: bytearray, memoryview or string.
+        :return: None
+        """
+        if isinstance(data, str):
+            self.crc = zlib.crc32(data, self.crc)
+        else:
+            view = memoryview(data)
+            for start in xrange(0, len(view), self.SLICE):
+                self.crc = zlib.crc32(view[start:start+self.SLICE].tobytes(), self.crc)
+        self.count += len(data)
+        return None
+
+    def digest(self):
+        """
+        :return: CRC.
+        """
+        return self.crc & 0xFFFFFFFF
+
+# Checksum algorithms by name, each stored big-endian in the first <size> bytes of the binary file
+CHECKSUM_ALGORITHMS = {'sum16': Sum16, 'crc16-ccitt': Crc16Ccitt, 'crc32': Crc32}
+DEFAULT_CHECKSUM = 'sum16'
+
+def new_checksum(name):
+    """
+    :param name: Name of checksum algorithm, see CHECKSUM_ALGORITHMS.
+    :return: New accumulator of the algorithm.
+    """
+    if name not in CHECKSUM_ALGORITHMS:
+        raise KeyError("Unknown checksum algorithm %s" %name)
+    return CHECKSUM_ALGORITHMS[name]()
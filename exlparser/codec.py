@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 09:26:37 PM CET
+
+import re
+
+import xlrd
+from scale import int_repr_to_binary_real, dec_int_to_binary_real, extend_string_to_fix_length
+
+# Name of columns read from excel
+COLUMNS = ('Key ID', 'Item length', 'Factory Default (N-Value) Hex', 'Calibration Name', 'Key Name')
+# Name of cell types, for error messages
+TYPE_MAP = {0: 'EMPTY', 1: 'TEXT', 2: 'NUMBER', 3: 'DATE', 4: 'BOOLEAN', 5: 'ERROR', 6: 'BLANK'}
+# Characters of calibration name replaced by '_' in header
+ILLEGAL_CALI_PATTERN = re.compile(r"^\d|\W+")
+
+#-----------------------------------
+#   Key ID decoders, by cell type
+#-----------------------------------
+def decode_number_key(value):
+    """Key ID written as number, whose decimal digits are the hex digits."""
+    return int(str(int(value)), 16)
+
+def decode_text_key(value):
+    """Key ID written as hex text."""
+    return int(value.encode("utf-8"), 16)
+
+KEY_DECODERS = {xlrd.XL_CELL_NUMBER: decode_number_key, xlrd.XL_CELL_TEXT: decode_text_key}
+
+#-----------------------------------
+#   Value encoders, by cell type
+#-----------------------------------
+def encode_number_value(value, length):
+    """Value written as number, whose decimal digits are the hex digits."""
+    return int_repr_to_binary_real(int(value), length)
+
+def encode_text_value(value, length):
+    """Value written as text, either a quoted string or hex digits."""
+    value = value.encode("utf-8")
+    if value.startswith('"'):
+        # String start with '"'are real representation as real binary, except length
+        return extend_string_to_fix_length(value[1:-1], length)
+    return dec_int_to_binary_real(int(value, 16), length)
+
+VALUE_ENCODERS = {xlrd.XL_CELL_NUMBER: encode_number_value, xlrd.XL_CELL_TEXT: encode_text_value}
+
+class RowCodec(object):
+    """Plan converting rows of a calibration sheet, compiled once from its column names row.
+
+    Column indices are resolved and the decoder of each column is picked by cell type, so that converting a row
+    is only a few lookups and calls.
+    """
+
+    def __init__(self, column_names):
+        """
+        :param column_names: Values of the column names row(row 1) of the sheet.
+        """
+        self.key_idx, self.length_idx, self.value_idx, self.cali_idx, self.name_idx = \
+            [column_names.index(column) for column in COLUMNS]
+
+    def key(self, cell):
+        """
+        :param cell: Key ID cell.
+        :return: Key ID(int).
+        """
+        decoder = KEY_DECODERS.get(cell.ctype)
+        if decoder is None:
+            raise TypeError("'Key ID' type should not be %s" %TYPE_MAP[cell.ctype])
+        key = decoder(cell.value)
+        if not 0 <= key <= 0xFFFF:
+            raise ValueError("Key ID %X is wider than 16 bits" %key)
+        return key
+
+    def convert(self, row):
+        """Convert a row to both binary fragment and header entry, the same as binary_converter and preprocess.
+
+        :param row: List of cells, whose Key ID cell is not empty.
+        :return: Tuple of (Key ID, bit length, value binary, [cali(char), keyLength(float), keyName(char)]).
+        """
+        key = self.key(row[self.key_idx])
+
+        length_cell = row[self.length_idx]
+        if length_cell.ctype is not xlrd.XL_CELL_NUMBER:
+            raise TypeError("'Length' type should not be %s" %TYPE_MAP[length_cell.ctype])
+        length = int(length_cell.value)
+        if not 0 <= length <= 0xFFFF:
+            raise ValueError("Length %d is wider than 16 bits" %length)
+
+        value_cell = row[self.value_idx]
+        encoder = VALUE_ENCODERS.get(value_cell.ctype)
+        if encoder is None:
+            raise TypeError("'Value' type should not be %s" %TYPE_MAP[value_cell.ctype])
+        value_bin = encoder(value_cell.value, length)
+
+        cali = row[self.cali_idx]
+        if cali.ctype is not xlrd.XL_CELL_TEXT:
+            raise TypeError("Type of calibration cell should not be %s" %TYPE_MAP[cali.ctype])
+        name = row[self.name_idx]
+        if name.ctype is xlrd.XL_CELL_TEXT:
+            name_convert = name.value.encode("utf-8")
+        elif name.ctype is xlrd.XL_CELL_EMPTY:
+            name_convert = ''
+        else:
+            raise TypeError("Type of KeyName cell should not be %s" %TYPE_MAP[name.ctype])
+        entry = [ILLEGAL_CALI_PATTERN.sub("_", cali.value.encode("utf-8")), length_cell.value, name_convert]
+        return key, length, value_bin, entry
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 01:42:57 AM CET
+
+"""Python module of ctypes decoders of key records, laid out as the structures of header.h.
+
+The generated module is standalone(only ctypes is needed) and runs on python 2 & 3:
+
+    import calibration_decoders
+    image = bytearray(open('bt.bin', 'rb').read())
+    for key, record in calibration_decoders.records(image, 'bt.xls'):
+        ...
+
+Each excel has its own registry of structures, as excels may lay out the same Key ID differently.
+"""
+
+import itertools
+
+from codec import ILLEGAL_CALI_PATTERN
+
+DECODERS_FILE_NAME = "calibration_decoders.py"
+
+MODULE_PROLOGUE = '''#!/usr/bin/env python
+# Generated by exchanger from calibration excels, do not edit.
+"""Decoders of key records of binary files, a ctypes structure per Key Name laid out as header.h.
+
+Structures are created by from_buffer() on the bytearray of a binary file, sharing memory with it:
+
+    image = bytearray(open('bt.bin', 'rb').read())
+    for key, record in records(image, 'bt.xls'):
+        ...
+"""
+
+import ctypes
+
+HEADER_SIZE = 14
+# Excel name to dict of Key ID to structure
+EXCELS = {}
+
+'''
+
+MODULE_EPILOGUE = '''def records(image, excel, header_size=HEADER_SIZE, end=None):
+    """Yield (Key ID, record) of each record of image. Record is the structure of the Key ID sharing memory
+    with image, or a memoryview of the value if there is no structure of its size.
+
+    :param image: bytearray of binary file.
+    :param excel: Name of the excel the binary file is converted from, a key of EXCELS.
+    :param header_size: Bytes of the header.
+    :param end: End offset of records, None for the end of image.
+    """
+    structures = EXCELS[excel]
+    view = memoryview(image)
+    offset = header_size
+    end = len(image) if end is None else end
+    while offset + 4 <= end:
+        key = (image[offset] << 8) | image[offset + 1]
+        length = (image[offset + 2] << 8) | image[offset + 3]
+        offset += 4
+        size = (length + 7) // 8
+        structure = structures.get(key)
+        if structure is not None and ctypes.sizeof(structure) == size:
+            yield key, structure.from_buffer(image, offset)
+        else:
+            yield key, view[offset:offset + size]
+        offset += size
+'''
+
+def gen_structure(name, fields):
+    """
+    :param name: Class name.
+    :param fields: List of field definitions(source).
+    :return: Source of the ctypes structure class.
+    """
+    content = "class %s(ctypes.BigEndianStructure):\n    _pack_ = 1\n    _fields_ = [" %name
+    content += ",\n                ".join(fields)
+    content += "]\n\n"
+    return content
+
+def gen_decoders(keys, entries):
+    """Generate decoders of a sheet, a structure per Key Name as gen_header() lays it out, each bit-field byte
+    being a nested structure(first field at the most significant bit). Characters of Key Name illegal in an
+    identifier are replaced by '_'.
+
+    :param keys: Key ID of each entry.
+    :param entries: List of lists with content [cali(char), keyLength(float), keyName(char)].
+    :return: Source of the structure classes and their registration in keys, the registry of the excel, see
+             gen_decoder_module().
+    """
+    content = ""
+    registered = []
+    bit_struct_count = 0
+    for name, group in itertools.groupby(itertools.izip(keys, entries), lambda item: item[1][2]):
+        # Exclude header-info entries
+        if name == '':
+            continue
+        name = ILLEGAL_CALI_PATTERN.sub("_", name)
+        fields = []
+        pool = []
+        pool_bits = 0
+        byte_counter = 0
+        group_keys = []
+        for key, (cali, keyLength, keyName) in group:
+            if key not in group_keys:
+                group_keys.append(key)
+            if keyLength % 8 != 0:
+                pool.append("('%s', ctypes.c_uint8, %d)" %(cali, int(keyLength)))
+                pool_bits += int(keyLength)
+                if pool_bits > 8:
+                    raise KeyError("Bit fields cross byte boundary!!!")
+                if pool_bits == 8:
+                    bit_struct = "%s_BYTE%d" %(name, bit_struct_count)
+                    content += gen_structure(bit_struct, pool)
+                    fields.append("('%sBYTE%d', %s)" %(name, byte_counter, bit_struct))
+                    bit_struct_count += 1
+                    byte_counter += 1
+                    pool = []
+                    pool_bits = 0
+            else:
+                if pool:
+                    raise KeyError("Bit fields do not fill whole byte!!!")
+                byte_counter = 0
+                fields.append("('%s', ctypes.c_uint8 * %d)" %(cali.strip(), int(keyLength / 8)))
+        if pool:
+            raise KeyError("Bit fields do not fill whole byte!!!")
+        content += gen_structure(name, fields)
+        registered += [(key, name) for key in group_keys]
+    for key, name in registered:
+        content += "keys[0x%04X] = %s\n" %(key, name)
+    return content
+
+def gen_decoder_module(sections):
+    """
+    :param sections: List of (excel name, decoders source of the excel).
+    :return: Source of the module.
+    """
+    content = MODULE_PROLOGUE
+    for excel, section in sections:
+        content += "#-----------------------------------\n#   %s\n#-----------------------------------\n" %excel
+        content += "keys = EXCELS[%r] = {}\n" %excel
+        content += section + "\n"
+    content += MODULE_EPILOGUE
+    return content
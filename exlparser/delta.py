@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 11:52:06 PM CET
+
+"""Delta between two revisions of a binary file, at the level of key records.
+
+Usage:
+    python delta.py make OLD_BIN NEW_BIN PATCH
+    python delta.py apply OLD_BIN PATCH NEW_BIN
+
+Patch format:
+|MAGIC 'CDLT'(4 bytes)|FLAGS(1 byte)|CHECKSUM name length(1 byte)|CHECKSUM name|HEADER size(2 bytes)|
+|old checksum(checksum size)|new header(HEADER size, starting with new checksum)|COUNT of ops(4 bytes)|OP|...
+
+Each OP starts with its code(1 byte) and Key ID(2 bytes):
+    'U': record of the key gets a new value, followed by LENGTH(2 bytes)|VALUE
+    'D': record of the key is removed
+    'I': record is inserted after the record of ANCHOR key, followed by ANCHOR(2 bytes)|LENGTH(2 bytes)|VALUE
+    'F': record is inserted before all records, followed by LENGTH(2 bytes)|VALUE
+Both making and applying a patch take linear time of the file size.
+"""
+
+import sys
+import struct
+import argparse
+
+from checksums import new_checksum, DEFAULT_CHECKSUM, CHECKSUM_ALGORITHMS
+from writer import BinWriter, KEY_LENGTH
+from reader import BinReader, HEADER_SIZE
+
+DELTA_MAGIC = 'CDLT'
+# FLAGS: the files have a key directory
+FLAG_INDEXED = 0x01
+OP_KEY = struct.Struct('>cH')
+# ANCHOR, LENGTH and HEADER size
+WORD = struct.Struct('>H')
+COUNT = struct.Struct('>I')
+
+def make_delta(old, new, checksum=DEFAULT_CHECKSUM, header_size=HEADER_SIZE, indexed=False):
+    """Make a patch turning old binary file content into the new one.
+
+    Records of keys in both files keep their relative order unless moved, a moved record is removed and inserted
+    again.
+
+    :param old: Old binary file content.
+    :param new: New binary file content.
+    :param checksum: Name of checksum algorithm of both files.
+    :param header_size: Bytes of the header.
+    :param indexed: Whether both files have a key directory.
+    :return: Patch(bytearray).
+    """
+    old_reader = BinReader(old, header_size, indexed)
+    new_reader = BinReader(new, header_size, indexed)
+    checksum_size = new_checksum(checksum).size
+    old_records = {}
+    old_index = {}
+    for index, (key, length, value) in enumerate(old_reader.records()):
+        old_records[key] = (length, value)
+        old_index[key] = index
+
+    ops = []
+    kept = set()
+    last_index = -1
+    anchor = None
+    for key, length, value in new_reader.records():
+        index = old_index.get(key)
+        if index is not None and index > last_index:
+            # Kept in place, maybe with new value
+            last_index = index
+            kept.add(key)
+            old_length, old_value = old_records[key]
+            if old_length != length or old_value != value:
+                ops.append(('U', key, None, length, value))
+        elif anchor is None:
+            ops.append(('F', key, None, length, value))
+        else:
+            ops.append(('I', key, anchor, length, value))
+        anchor = key
+    deleted = [key for key in old_records if key not in kept]
+
+    patch = bytearray(DELTA_MAGIC)
+    patch.append(FLAG_INDEXED if indexed else 0)
+    patch.append(len(checksum))
+    patch += checksum
+    patch += WORD.pack(header_size)
+    patch += old_reader.view[:checksum_size]
+    patch += new_reader.header
+    patch += COUNT.pack(len(deleted) + len(ops))
+    for key in sorted(deleted):
+        patch += OP_KEY.pack('D', key)
+    for code, key, anchor, length, value in ops:
+        patch += OP_KEY.pack(code, key)
+        if code == 'I':
+            patch += WORD.pack(anchor)
+        patch += WORD.pack(length)
+        patch += value
+    return patch
+
+def read_delta(patch):
+    """
+    :param patch: Patch content.
+    :return: Tuple of (flags, checksum name, header size, old checksum bytes, new header, list of ops), each op
+             is a tuple of (code, Key ID, anchor Key ID or None, bit length or None, value memoryview or None).
+    """
+    view = memoryview(patch)
+    if view[:4].tobytes() != DELTA_MAGIC:
+        raise ValueError("Not a patch")
+    flags = ord(view[4])
+    name_size = ord(view[5])
+    checksum = view[6:6+name_size].tobytes()
+    offset = 6 + name_size
+    header_size = WORD.unpack_from(patch, offset)[0]
+    offset += WORD.size
+    checksum_size = new_checksum(checksum).size
+    old_checksum = view[offset:offset+checksum_size]
+    offset += checksum_size
+    header = view[offset:offset+header_size]
+    offset += header_size
+    count = COUNT.unpack_from(patch, offset)[0]
+    offset += COUNT.size
+    ops = []
+    try:
+        for index in xrange(count):
+            code, key = OP_KEY.unpack_from(patch, offset)
+            offset += OP_KEY.size
+            anchor = length = value = None
+            if code == 'I':
+                anchor = WORD.unpack_from(patch, offset)[0]
+                offset += WORD.size
+            if code in 'UIF':
+                length = WORD.unpack_from(patch, offset)[0]
+                offset += WORD.size
+                size = (length + 7) / 8
+                value = view[offset:offset+size]
+                if len(value) != size:
+                    raise ValueError("Patch is truncated")
+                offset += size
+            elif code != 'D':
+                raise ValueError("Unknown op %r of patch" %code)
+            ops.append((code, key, anchor, length, value))
+    except struct.error:
+        raise ValueError("Patch is truncated")
+    return flags, checksum, header_size, old_checksum, header, ops
+
+def apply_delta(old, patch):
+    """Rebuild new binary file content from old one and patch.
+
+    :param old: Old binary file content.
+    :param patch: Patch made by make_delta().
+    :return: New binary file content(bytearray), raising ValueError if old one is not the base of patch, or
+             the result does not match the checksum.
+    """
+    flags, checksum, header_size, old_checksum, header, ops = read_delta(patch)
+    indexed = bool(flags & FLAG_INDEXED)
+    old_reader = BinReader(old, header_size, indexed)
+    if old_reader.view[:len(old_checksum)] != old_checksum:
+        raise ValueError("Old binary file is not the base of patch")
+
+    updated = {}
+    deleted = set()
+    # Inserted record following each anchor key, None for the 1st one
+    inserted = {}
+    for code, key, anchor, length, value in ops:
+        if code == 'U':
+            updated[key] = (length, value)
+        elif code == 'D':
+            deleted.add(key)
+        else:
+            inserted[anchor] = (key, length, value)
+
+    writer = BinWriter(checksum, header=False)
+    buf = writer.buffer
+    buf += header
+
+    def write(key, length, value):
+        buf.extend(KEY_LENGTH.pack(key, length))
+        buf.extend(value)
+        # Records inserted after this one
+        while key in inserted:
+            key, length, value = inserted.pop(key)
+            buf.extend(KEY_LENGTH.pack(key, length))
+            buf.extend(value)
+
+    if None in inserted:
+        write(*inserted.pop(None))
+    for key, length, value in old_reader.records():
+        if key in deleted:
+            continue
+        length, value = updated.get(key, (length, value))
+        write(key, length, value)
+    if inserted:
+        raise ValueError("Anchor Key ID %04X of patch is not found" %min(inserted))
+
+    if indexed:
+        writer.header_size = header_size
+        writer.write_directory()
+    if not BinReader(buf, header_size).check_checksum(checksum):
+        raise ValueError("Patched binary file does not match checksum")
+    return buf
+
+#-----------------------------------
+#               Main
+#-----------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Make or apply a delta between revisions of a binary file.")
+    subparsers = parser.add_subparsers(dest="command")
+    make_parser = subparsers.add_parser("make", help="Make a patch from OLD to NEW")
+    make_parser.add_argument("old")
+    make_parser.add_argument("new")
+    make_parser.add_argument("patch")
+    make_parser.add_argument("--checksum", choices=sorted(CHECKSUM_ALGORITHMS), default=DEFAULT_CHECKSUM,
+                             help="Checksum algorithm of binary files (default: %s)" %DEFAULT_CHECKSUM)
+    make_parser.add_argument("--header-size", type=int, default=HEADER_SIZE,
+                             help="Bytes of the header (default: %d)" %HEADER_SIZE)
+    make_parser.add_argument("--indexed", action="store_true", help="Binary files have a key directory")
+    apply_parser = subparsers.add_parser("apply", help="Rebuild NEW from OLD and PATCH")
+    apply_parser.add_argument("old")
+    apply_parser.add_argument("patch")
+    apply_parser.add_argument("new")
+    args = parser.parse_args()
+
+    with open(args.old, 'rb') as f:
+        old = f.read()
+    if args.command == "make":
+        with open(args.new, 'rb') as f:
+            new = f.read()
+        patch = make_delta(old, new, args.checksum, args.header_size, args.indexed)
+        with open(args.patch, 'wb') as f:
+            f.write(patch)
+        print "Patch of %d bytes for %d-byte %s" %(len(patch), len(new), args.new)
+    else:
+        with open(args.patch, 'rb') as f:
+            patch = f.read()
+        try:
+            new = apply_delta(old, patch)
+        except ValueError as error:
+            sys.exit("Failed to apply patch: %s" %error)
+        with open(args.new, 'wb') as f:
+            f.write(new)
+        print "%s rebuilt, %d bytes" %(args.new, len(new))
@@ -3,15 +3,41 @@
 # Author: Zhaoting Weng
 # Created Time: Thu 18 Dec 2014 01:52:00 PM CET
 
+import sys
 import os.path
-import platform
+import argparse
+import itertools
+import json
+import time
+import functools
+import multiprocessing
 import binascii
-import re
+import socket
 from collections import OrderedDict
+from cStringIO import StringIO
 
 import xlrd
 from utility import *
 from scale import *
+from cache import BuildCache, cache_key
+from writer import BinWriter
+from checksums import Sum16, new_checksum, CHECKSUM_ALGORITHMS, DEFAULT_CHECKSUM
+from fragment import FragmentTable
+from timing import Profiler, NULL_PROFILER
+from codec import COLUMNS, TYPE_MAP, ILLEGAL_CALI_PATTERN, RowCodec
+from validation import ValidationError, validate_sheet
+from keymap import KEY_NAME_MAP_FILE_NAME, collect_key_names, format_key_names, parse_key_names, merge_key_names, \
+    gen_key_name_map
+from decoders import DECODERS_FILE_NAME, gen_decoders, gen_decoder_module
+from incremental import INDEX_SUFFIX, IndexedGroup, scan_groups, load_index, save_index
+
+HEADER_FILE_NAME = "header.h"
+VALIDATION_FILE_NAME = "validation.json"
+# Bump when the content generated from the same excel changes
+EXCHANGER_VERSION = "1.4"
+# Leading bytes of .xls(OLE2 compound document) and .xlsx(zip) file
+XLS_SIGNATURE = '\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+XLSX_SIGNATURE = 'PK\x03\x04'
 
 
 def binary_converter(key, length, value):
@@ -24,8 +50,6 @@ def binary_converter(key, length, value):
 
     :returns: list of three part of binary fragment
     """
-    TYPE_MAP = {0: 'EMPTY', 1: 'TEXT', 2: 'NUMBER', 3: 'DATE', 4: 'BOOLEAN', 5: 'ERROR', 6: 'BLANK'}
-
     # <Key ID>
     if key.ctype is xlrd.XL_CELL_NUMBER:
         key_bin = int_repr_to_binary_real(int(key.value), 16)
@@ -67,31 +91,6 @@ def binary_converter(key, length, value):
     fragment = [key_bin, length_bin, value_bin]
     return fragment
 
-def fill_header(fragments):
-    """Manipulate the 1st fragment(Striping length & keyid infos, fill in checksum).
-
-    :param fragments: List of fragment.
-    :return: None
-    """
-    # 1. Strip 1st fragment's length & keyid infos
-    fragments[0] = ['', '', fragments[0][2]]
-
-    # 2. Checksum
-    values = ''.join([''.join(f) for f in fragments])[2:]      # Exclude 2-byte value of "checksum"
-    length = len(values)
-    bytecnt_is_even = True
-    if length % 2 != 0:
-        bytecnt_is_even = False
-        print "WARNING: byte counts for checksum is not even"
-    pairs = [values[i*2]+values[i*2+1] for i in range(length/2)]
-    if not bytecnt_is_even:
-        pairs += [values[length-1] + '\x00']
-    # Calculate checksum
-    check_sum = checksum(pairs)
-    # fill in checksum
-    fragments[0][2] = check_sum + fragments[0][2][2:]
-    return  None
-
 def preprocess(cali, length, name):
     """Preprocess for fragment.
     1. Check then convert Calibration character to encoded character, replacing illegal characters to '_';
@@ -103,15 +102,13 @@ def preprocess(cali, length, name):
     :param name: keyname cell.
     :return: Converted fragment.
     """
-    TYPE_MAP = {0: 'EMPTY', 1: 'TEXT', 2: 'NUMBER', 3: 'DATE', 4: 'BOOLEAN', 5: 'ERROR', 6: 'BLANK'}
     # 1
     if cali.ctype is not xlrd.XL_CELL_TEXT:
         error_info = "Type of calibration cell should not be %s" %(TYPE_MAP[cali.ctype])
         raise TypeError(error_info)
     else:
         cali_convert = cali.value.encode("utf-8")
-        p = re.compile(r"^\d|\W+")
-        cali_convert = p.sub("_", cali_convert)
+        cali_convert = ILLEGAL_CALI_PATTERN.sub("_", cali_convert)
     # 2
     if length.ctype is not xlrd.XL_CELL_NUMBER:
         error_info = "Type of keyLength cell should not be %s" %(TYPE_MAP[length.ctype])
@@ -130,70 +127,78 @@ def preprocess(cali, length, name):
         raise TypeError(error_info)
     return [cali_convert, length_convert, name_convert]
 
-def gen_header(fragments):
-    """Generate header file.
+def gen_header(fragments, sink=None):
+    """Generate header file, writing struct and union blocks one by one.
 
     :param fragments: List of lists with content [cali(char), keyLength(float), keyName(char)].
-    :return: String to be writen to file.
+    :param sink: File-like object the header is written to(may be shared by all workbooks of a run), None to
+                 return it.
+    :return: String to be writen to file, None if written to sink.
     """
+    if sink is None:
+        sink = StringIO()
+        gen_header(fragments, sink)
+        return sink.getvalue()
+    write = sink.write
     # Exclude header-info entires
     non_include_item_num = len([frg for frg in fragments if frg[2] == ''])
     fragments = fragments[non_include_item_num:]
 
-    content = ""
     pool = []
-    last_is_one_bit = False
+    pool_bits = 0
     byte_counter = 0
     length_sum = 0
     currentName = fragments[0][2]
     # Generate first header
-    content += "typedef struct s_%s\n{\n" %currentName
+    write("typedef struct s_%s\n{\n" %currentName)
     for fragment in fragments:
         cali, keyLength, keyName =  fragment
         # Check if Calibration has illegal character
         if keyName != currentName:
+            if len(pool) != 0:
+                raise KeyError("Bit fields do not fill whole byte!!!")
             # Generate last structure's tail
-            content += "} %s;\n\n" %currentName
+            write("} %s;\n\n" %currentName)
             # Generate Union
             if length_sum % 8 != 0:
                 error_info = "Bit-length of each structure is not 8's multiple"
                 raise KeyError(error_info)
-            content += "union u_%s\n{\n\tchar buffer[%d];\n\t%s map;\n};\n\n" %(currentName, length_sum/8, currentName)
+            write("union u_%s\n{\n\tchar buffer[%d];\n\t%s map;\n};\n\n" %(currentName, length_sum/8, currentName))
             # Reset length_sum
             length_sum = 0
             # Set current keyName to the new keyName
             currentName = keyName
             # Generate current structure's header
-            content += "typedef struct s_%s\n{\n" %currentName
-        if keyLength == 1.0:
-            last_is_one_bit = True
-            # Throw into pool
+            write("typedef struct s_%s\n{\n" %currentName)
+        if keyLength % 8 != 0:
+            # Throw bit field into pool
             pool.append(fragment)
-            if len(pool) == 8:
+            pool_bits += keyLength
+            if pool_bits > 8:
+                raise KeyError("Bit fields cross byte boundary!!!")
+            if pool_bits == 8:
                 # process pool
-                content += gen_bf_structure(pool, byte_counter)
+                gen_bf_structure(pool, byte_counter, sink)
                 byte_counter += 1
                 pool = []
+                pool_bits = 0
                 length_sum += 8
         else:
-            if last_is_one_bit and len(pool) != 0:
-            # Since if last is one bit length fragment, then if all the 8 ones are processed, the pool length should be 0 cause it is reset to empty list
-                raise KeyError("Not last continuous 8 entires with 1 bit length!!!")
-            if keyLength % 8 != 0:
-                raise ValueError("Length of Key is not 8's multiple!")
-            last_is_one_bit = False
+            if len(pool) != 0:
+            # Since if all the bit fields of last byte are processed, the pool length should be 0 cause it is reset to empty list
+                raise KeyError("Bit fields do not fill whole byte!!!")
             byte_counter = 0
             length_sum += keyLength
-            content += "\tchar %s[%d];\n" %(cali.strip(), int(keyLength / 8))
+            write("\tchar %s[%d];\n" %(cali.strip(), int(keyLength / 8)))
+    if len(pool) != 0:
+        raise KeyError("Bit fields do not fill whole byte!!!")
     # Generate last structure's tail
-    content += "} %s;\n\n" %currentName
+    write("} %s;\n\n" %currentName)
     # Generate last union
     if length_sum % 8 != 0:
         error_info = "Bit-length of each structure is not 8's multiple"
         raise KeyError(error_info)
-    content += "union u_%s\n{\n\tchar buffer[%d];\n\t%s map;\n};\n\n" %(currentName, length_sum/8, currentName)
-
-    return content
+    write("union u_%s\n{\n\tchar buffer[%d];\n\t%s map;\n};\n\n" %(currentName, length_sum/8, currentName))
 
 
 
@@ -211,75 +216,644 @@ def gen_header(fragments):
 #                return True
 #    return False
 
+class SheetModel(object):
+    """In-memory model of a calibration sheet, built by a single scan over its rows.
+
+    fragments: FragmentTable of binary fragments
+    entries: List of header entry, [cali(char), keyLength(float), keyName(char)]
+    keys: Key ID(int) of each entry
+    rows: Number of scanned rows
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.fragments = FragmentTable()
+        self.entries = []
+        self.keys = self.fragments.keys
+
+def parse_sheet(sheet, start=2, end=None, codec=None):
+    """Scan the rows of sheet once, converting each row to both binary fragment and header entry.
+
+    :param sheet: Calibration sheet.
+    :param start: Index of the first row to scan.
+    :param end: Index of the row to stop at, None for the last row(end of calibration block).
+    :param codec: RowCodec of the sheet, None to make it from the column names.
+    :return: SheetModel of the sheet.
+    """
+    # Get the column index of each field and the converter of each column
+    if codec is None:
+        codec = RowCodec(sheet.row_values(1))
+    # Get the end line number
+    if end is None:
+        end = len(sheet.col(codec.cali_idx)) - 1
+
+    model = SheetModel()
+    model.rows = max(end - start, 0)
+    key_idx, convert = codec.key_idx, codec.convert
+    append_fragment, append_entry = model.fragments.append, model.entries.append
+    # Iterate over each row
+    for row_count in xrange(start, end):
+        row = sheet.row(row_count)
+        if row[key_idx].ctype is not xlrd.XL_CELL_EMPTY:                 # If every row has consistent format, just check if it is empty
+            # Input: [1(keyid), 16(length), '7'(value), Calibration, KeyName]
+            key, length, value_bin, entry = convert(row)
+            # Output: 0x0001(keyid), 16(length), '\x00\x07'(value)
+            append_fragment(key, length, value_bin)
+            append_entry(entry)
+    return model
+
+def encode_fragments(fragments, profiler=NULL_PROFILER, checksum=DEFAULT_CHECKSUM, header=True):
+    """Merge fragments and write them to a BinWriter, without filling in checksum.
+
+    :param fragments: FragmentTable of binary fragments.
+    :param profiler: Profiler recording stages.
+    :param checksum: Name of checksum algorithm.
+    :param header: Whether fragments start with the header.
+    :return: BinWriter.
+    """
+    writer = BinWriter(checksum, header)
+    # 1st item of the header is the checksum
+    if header and len(fragments) and fragments.lengths[0] != writer.checksum.size * 8:
+        error_info = "Checksum item is %d bits, while %s needs %d bits" %(fragments.lengths[0], checksum,
+                                                                          writer.checksum.size * 8)
+        raise ValueError(error_info)
+    # Merge fragments with same id to one fragment
+    with profiler.stage('merge_fragment'):
+        fragments = fragments.merge()
+    # Strip length & keyid infos of the 1st fragment
+    with profiler.stage('write_binary'):
+        writer.write_table(fragments)
+    profiler.count('fragments', len(fragments))
+    return writer
+
+def gen_binary(fragments, profiler=NULL_PROFILER, checksum=DEFAULT_CHECKSUM, indexed=False):
+    """Generate binary file content.
+
+    :param fragments: FragmentTable of binary fragments.
+    :param profiler: Profiler recording stages.
+    :param checksum: Name of checksum algorithm.
+    :param indexed: Whether to append a key directory.
+    :return: bytearray to be writen to file.
+    """
+    writer = encode_fragments(fragments, profiler, checksum)
+    if indexed:
+        with profiler.stage('write_directory'):
+            writer.write_directory()
+    # Fill in checksum
+    with profiler.stage('checksum'):
+        writer.fill_checksum()
+    profiler.count('bin_bytes', len(writer.buffer))
+    return writer.buffer
+
+def split_sheet(sheet, chunk_rows):
+    """Split calibration rows of sheet into ranges of at least chunk_rows rows, only between key groups.
+
+    :param sheet: Calibration sheet.
+    :param chunk_rows: Least number of rows of each range(except the last one).
+    :return: List of (start, end) row ranges.
+    """
+    codec = RowCodec(sheet.row_values(1))
+    end = len(sheet.col(codec.cali_idx)) - 1
+    ranges = []
+    start = 2
+    last_key = None
+    for row_count, cell in enumerate(sheet.col_slice(codec.key_idx, 2, end), 2):
+        if cell.ctype is xlrd.XL_CELL_EMPTY:
+            continue
+        try:
+            key = codec.key(cell)
+        except (TypeError, ValueError):
+            # Invalid Key ID is reported when the chunk is converted
+            continue
+        if row_count - start >= chunk_rows and last_key is not None and key != last_key:
+            ranges.append((start, row_count))
+            start = row_count
+        last_key = key
+    ranges.append((start, end))
+    return ranges
+
+# Sheet being converted by chunks, inherited by forked worker processes
+_CHUNK_SHEET = None
+
+def convert_chunk(task):
+    """Parse and encode a range of rows of _CHUNK_SHEET, in a worker process.
+
+    :param task: Tuple of (start row, end row, name of checksum algorithm, whether the range starts with header).
+    :return: Tuple of (BinWriter, header entries, Key IDs, number of scanned rows).
+    """
+    start, end, checksum, header = task
+    model = parse_sheet(_CHUNK_SHEET, start, end)
+    writer = encode_fragments(model.fragments, checksum=checksum, header=header)
+    return writer, model.entries, model.keys, model.rows
+
+def convert_sheet_by_chunks(sheet, jobs, chunk_rows, profiler=NULL_PROFILER, checksum=DEFAULT_CHECKSUM,
+                            indexed=False):
+    """Convert sheet split at key groups, encoding and merging the chunks in worker processes. The result is the
+    same as gen_binary() on the whole sheet.
+
+    :param sheet: Calibration sheet.
+    :param jobs: Number of worker processes.
+    :param chunk_rows: Least number of rows of each chunk.
+    :param profiler: Profiler recording stages.
+    :param checksum: Name of checksum algorithm.
+    :param indexed: Whether to append a key directory.
+    :return: Tuple of (binary content, header entries, Key ID of each entry).
+    """
+    global _CHUNK_SHEET
+    with profiler.stage('split_sheet'):
+        ranges = split_sheet(sheet, chunk_rows)
+    tasks = [(start, end, checksum, index == 0) for index, (start, end) in enumerate(ranges)]
+    _CHUNK_SHEET = sheet
+    pool = multiprocessing.Pool(min(jobs, len(tasks)))
+    try:
+        with profiler.stage('convert_chunks'):
+            results = pool.map(convert_chunk, tasks)
+    finally:
+        pool.close()
+        pool.join()
+        _CHUNK_SHEET = None
+
+    writer = None
+    entries = []
+    entry_keys = []
+    chunk_keys = set()
+    with profiler.stage('join_chunks'):
+        for chunk_writer, chunk_entries, keys, rows in results:
+            # Key groups should not be split across chunks
+            key_set = set(keys)
+            for key in key_set & chunk_keys:
+                raise ValueError("Fragments of Key ID %04X are not contiguous" %key)
+            chunk_keys |= key_set
+            if writer is None:
+                writer = chunk_writer
+            else:
+                writer.extend(chunk_writer)
+            entries += chunk_entries
+            entry_keys.extend(keys)
+            profiler.count('rows', rows)
+    if indexed:
+        with profiler.stage('write_directory'):
+            writer.write_directory()
+    with profiler.stage('checksum'):
+        writer.fill_checksum()
+    profiler.count('chunks', len(tasks))
+    profiler.count('entries', len(entries))
+    profiler.count('bin_bytes', len(writer.buffer))
+    return writer.buffer, entries, entry_keys
+
+def convert_sheet_incremental(sheet, old_groups, profiler=NULL_PROFILER, checksum=DEFAULT_CHECKSUM, indexed=False):
+    """Convert sheet, encoding and merging only the key groups whose rows changed since the last conversion. The
+    content and header entries of other groups are taken from the index, and so is their part of a Sum16
+    checksum. The result is the same as gen_binary() on the whole sheet.
+
+    :param sheet: Calibration sheet.
+    :param old_groups: Dict of Key ID to IndexedGroup of the last conversion, see incremental.load_index().
+    :param profiler: Profiler recording stages.
+    :param checksum: Name of checksum algorithm.
+    :param indexed: Whether to append a key directory.
+    :return: Tuple of (binary content, header entries, Key ID of each entry, list of IndexedGroup to be saved).
+    """
+    with profiler.stage('digest_rows'):
+        scanned = scan_groups(sheet)
+    codec = RowCodec(sheet.row_values(1))
+    writer = None
+    groups = []
+    entries = []
+    entry_keys = []
+    converted = 0
+    with profiler.stage('encode_groups'):
+        for key, digest, start, end in scanned:
+            header = writer is None
+            group = old_groups.get(key)
+            if group is not None and group.digest == digest and group.header == header:
+                group_writer = BinWriter.restore(checksum, group.content, header, group.state)
+            else:
+                model = parse_sheet(sheet, start, end, codec)
+                group_writer = encode_fragments(model.fragments, checksum=checksum, header=header)
+                state = group_writer.checksum.state() if isinstance(group_writer.checksum, Sum16) else None
+                group = IndexedGroup(key, digest, header, str(group_writer.buffer), model.entries, state)
+                converted += 1
+            if writer is None:
+                writer = group_writer
+            else:
+                writer.extend(group_writer)
+            groups.append(group)
+            entries += group.entries
+            entry_keys += [key] * len(group.entries)
+    if writer is None:
+        writer = BinWriter(checksum)
+    if indexed:
+        with profiler.stage('write_directory'):
+            writer.write_directory()
+    with profiler.stage('checksum'):
+        writer.fill_checksum()
+    profiler.count('key_groups', len(groups))
+    profiler.count('key_groups_converted', converted)
+    profiler.count('entries', len(entries))
+    profiler.count('bin_bytes', len(writer.buffer))
+    return writer.buffer, entries, entry_keys, groups
+
+def open_sheet(workbook, sheet=0, file_contents=None):
+    """Open workbook on demand and load only one sheet of it. Then the file content is released, the loaded sheet
+    should be unloaded by book.unload_sheet(sheet.number) after use.
+
+    Note that xlrd loads every sheet of .xlsx anyway, the other sheets are unloaded right away.
+
+    :param workbook: Path of the excel(str or unicode), or content of the excel file(.xls or .xlsx) as str or
+                     bytearray, which is told from a path by its leading bytes.
+    :param sheet: Name(string) or index(int) of the sheet.
+    :param file_contents: Content of the excel file as str or bytearray, always passed to xlrd as content.
+                          workbook is then only the name of the excel.
+    :return: Tuple of (Book, Sheet).
+    """
+    if file_contents is None:
+        if isinstance(workbook, bytearray):
+            workbook = str(workbook)
+        # Only str may hold file content, unicode is always a path
+        if isinstance(workbook, str) and (workbook.startswith(XLS_SIGNATURE) or
+                                          workbook.startswith(XLSX_SIGNATURE)):
+            workbook, file_contents = None, workbook
+    elif isinstance(file_contents, bytearray):
+        file_contents = str(file_contents)
+    if file_contents is not None:
+        book = xlrd.open_workbook(workbook, file_contents=file_contents, on_demand=True)
+    else:
+        book = xlrd.open_workbook(workbook, on_demand=True)
+    try:
+        if isinstance(sheet, basestring):
+            sheet = book.sheet_by_name(sheet)
+        else:
+            sheet = book.sheet_by_index(sheet)
+        for index in range(book.nsheets):
+            if index != sheet.number and book.sheet_loaded(index):
+                book.unload_sheet(index)
+    finally:
+        book.release_resources()
+    return book, sheet
+
+def convert_workbook(workbook, profiler=NULL_PROFILER, checksum=DEFAULT_CHECKSUM, jobs=1, chunk_rows=0,
+                     validate=True, sheet=0, indexed=False, extras=False, index_file=None, header_sink=None,
+                     file_contents=None):
+    """Convert workbook to binary content and header content in memory.
+
+    :param workbook: Path of the excel, or content of the excel file(.xls or .xlsx), see open_sheet().
+    :param profiler: Profiler recording stages.
+    :param checksum: Name of checksum algorithm.
+    :param jobs: Number of worker processes converting a sheet of more than chunk_rows rows by chunks.
+    :param chunk_rows: Least number of rows of each chunk, 0 to convert sheet as a whole.
+    :param validate: Whether to validate the whole sheet before encoding, raising ValidationError with every
+                     violation found.
+    :param sheet: Name(string) or index(int) of the calibration sheet.
+    :param indexed: Whether to append a key directory to binary content.
+    :param extras: Whether to return key names content and decoders content as well, see
+                   keymap.format_key_names() and decoders.gen_decoders().
+    :param index_file: Path of the sidecar index, to convert only the key groups changed since the index was
+                       saved and save it again, None to convert the whole sheet.
+    :param header_sink: File-like object the header is streamed to, see gen_header(). None to return it.
+    :param file_contents: Content of the excel file, see open_sheet().
+    :return: Tuple of (binary content, header content), plus key names content and decoders content if extras.
+             Header content is None if written to header_sink.
+    """
+    # Index is only reused by a conversion of the same version and settings
+    index_stamp = "%s:%s:%r" %(EXCHANGER_VERSION, checksum, sheet)
+    with profiler.stage('open_workbook'):
+        book, sheet = open_sheet(workbook, sheet, file_contents)
+    try:
+        if validate:
+            with profiler.stage('validate'):
+                violations = validate_sheet(sheet, new_checksum(checksum).size)
+            profiler.count('violations', len(violations))
+            if violations:
+                raise ValidationError(violations)
+        if index_file is not None:
+            with profiler.stage('load_index'):
+                old_groups = load_index(index_file, index_stamp)
+            bin_content, entries, entry_keys, groups = convert_sheet_incremental(sheet, old_groups, profiler,
+                                                                                 checksum, indexed)
+            with profiler.stage('save_index'):
+                save_index(index_file, index_stamp, groups)
+        # Worker processes inherit the sheet by fork
+        elif jobs > 1 and 0 < chunk_rows < sheet.nrows and sys.platform != 'win32':
+            bin_content, entries, entry_keys = convert_sheet_by_chunks(sheet, jobs, chunk_rows, profiler, checksum,
+                                                               indexed)
+        else:
+            with profiler.stage('parse_sheet'):
+                model = parse_sheet(sheet)
+            profiler.count('rows', model.rows)
+            profiler.count('entries', len(model.entries))
+            bin_content = gen_binary(model.fragments, profiler, checksum, indexed)
+            entries, entry_keys = model.entries, model.keys
+    finally:
+        book.unload_sheet(sheet.number)
+    with profiler.stage('gen_header'):
+        if header_sink is None:
+            header_content = gen_header(entries)
+            profiler.count('header_bytes', len(header_content))
+        else:
+            header_start = header_sink.tell()
+            header_content = gen_header(entries, header_sink)
+            profiler.count('header_bytes', header_sink.tell() - header_start)
+    if extras:
+        with profiler.stage('gen_decoders'):
+            decoders_content = gen_decoders(entry_keys, entries)
+        return (bin_content, header_content, format_key_names(collect_key_names(entry_keys, entries)),
+                decoders_content)
+    return bin_content, header_content
+
+def convert_excel(excel_file, cache=None, profile=False, checksum=DEFAULT_CHECKSUM, checksum_for=None,
+                  jobs=1, chunk_rows=0, sheet=0, sheet_for=None, indexed=False, index_dir=None, header_sink=None):
+    """Convert one excel to binary content and header content.
+
+    :param excel_file: Path of the excel.
+    :param cache: BuildCache to lookup/store the result, None to always convert.
+    :param profile: Whether to profile the conversion.
+    :param checksum: Name of checksum algorithm.
+    :param checksum_for: Dict of excel file name to name of checksum algorithm, overriding checksum.
+    :param jobs: Number of worker processes converting a big excel by chunks.
+    :param chunk_rows: Least number of rows of each chunk, 0 to convert excel as a whole.
+    :param sheet: Name(string) or index(int) of the calibration sheet.
+    :param sheet_for: Dict of excel file name to name or index of the calibration sheet, overriding sheet.
+    :param indexed: Whether to append a key directory to binary content.
+    :param index_dir: Directory of sidecar indexes, to convert only the changed key groups of a changed excel,
+                      None to convert it as a whole.
+    :param header_sink: File-like object the header is written to, None to return it. The header is streamed
+                        to it unless it has to be cached.
+    :return: Tuple of (binary content, header content, key names content, decoders content, profile report or
+             None). Header content is None if written to header_sink.
+    """
+    if checksum_for:
+        checksum = checksum_for.get(os.path.basename(excel_file), checksum)
+    if sheet_for:
+        sheet = sheet_for.get(os.path.basename(excel_file), sheet)
+    profiler = Profiler() if profile else NULL_PROFILER
+    with profiler.stage('total'):
+        # Read input excel
+        with profiler.stage('read_file'):
+            with open(excel_file, 'rb') as f:
+                file_contents = f.read()
+        result = None
+        if cache is not None:
+            key = cache_key(file_contents, "%s:%s:%r%s" %(EXCHANGER_VERSION, checksum, sheet,
+                                                          ":indexed" if indexed else ""), COLUMNS)
+            with profiler.stage('cache_get'):
+                result = cache.get(key)
+            if result is not None and len(result) < 4:
+                # Entry without key names or decoders
+                result = None
+            profiler.count('cache_hit', int(result is not None))
+        if result is None:
+            index_file = None
+            if index_dir is not None:
+                index_file = os.path.join(index_dir, os.path.basename(excel_file) + INDEX_SUFFIX)
+            result = convert_workbook(excel_file, profiler, checksum, jobs, chunk_rows, sheet=sheet,
+                                      indexed=indexed, extras=True, index_file=index_file,
+                                      header_sink=header_sink if cache is None else None,
+                                      file_contents=file_contents)
+            if cache is not None:
+                with profiler.stage('cache_put'):
+                    cache.put(key, *result)
+        if header_sink is not None and result[1] is not None:
+            # Header is cached as a string
+            header_sink.write(result[1])
+            result = (result[0], None) + tuple(result[2:])
+    return tuple(result) + (profiler.report(),)
+
+def convert_excel_checked(excel_file, **kwargs):
+    """Convert one excel as convert_excel, returning violations of an invalid excel instead of raising.
+
+    :param excel_file: Path of the excel.
+    :param kwargs: Keyword arguments of convert_excel.
+    :return: Tuple of (binary content, header content, key names content, decoders content, profile report or
+             None, list of violations), the contents and report are None if there is any violation.
+    """
+    try:
+        return convert_excel(excel_file, **kwargs) + ([],)
+    except ValidationError as error:
+        return None, None, None, None, None, error.violations
+
+def sheet_arg(value):
+    """
+    :param value: Sheet of command line, index if it is digits, otherwise name.
+    :return: Index(int) or name(unicode) of the sheet.
+    """
+    if value.isdigit():
+        return int(value)
+    return value.decode(sys.getfilesystemencoding() or 'utf-8')
+
+def rename_over(src, dst):
+    """Rename src to dst, replacing dst atomically(on Windows dst has to be removed first)."""
+    if sys.platform == 'win32' and os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
+
+def replace_file(path, contents):
+    """Replace file by writing a temporary file renamed over it, so that readers see either the old file or
+    the new one.
+
+    :param path: Path of the file.
+    :param contents: Iterable of strings making up the new content, None to remove the file.
+    :return: None
+    """
+    if contents is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    tmp_path = "%s.%d.tmp" %(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            for content in contents:
+                f.write(content)
+        rename_over(tmp_path, path)
+    except:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return None
+
+def write_run_files(output_dir, key_names, decoders, invalid):
+    """Write the files made from all excels of a run, besides binary files and header file.
+
+    :param output_dir: Directory of output files.
+    :param key_names: Lists of (Key ID, Key Name) of each valid excel.
+    :param decoders: List of (excel, decoders content) of each valid excel.
+    :param invalid: OrderedDict of each invalid excel to its violations.
+    :return: Path of the validation report.
+    """
+    # Create header B, mapping Key ID to Key Name of all excels
+    key_names = merge_key_names(key_names)
+    key_name_map = None
+    if key_names:
+        print "Generation %s..." %(KEY_NAME_MAP_FILE_NAME)
+        key_name_map = [gen_key_name_map(key_names)]
+    replace_file(os.path.join(output_dir, KEY_NAME_MAP_FILE_NAME), key_name_map)
+
+    # Python decoders of records of all excels
+    decoder_module = None
+    if decoders:
+        print "Generation %s..." %(DECODERS_FILE_NAME)
+        decoder_module = [gen_decoder_module(decoders)]
+    replace_file(os.path.join(output_dir, DECODERS_FILE_NAME), decoder_module)
+
+    # Violations of all invalid excels, as one report
+    validation_file = os.path.join(output_dir, VALIDATION_FILE_NAME)
+    report = None
+    if invalid:
+        report = [json.dumps(OrderedDict([('version', EXCHANGER_VERSION), ('excels', invalid)]), indent=2,
+                             separators=(',', ': '))]
+    replace_file(validation_file, report)
+    return validation_file
+
 #-----------------------------------
 #               Main
 #-----------------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert calibration excels to binary files and C header.")
+    parser.add_argument("-i", "--input", default=os.path.join(os.pardir, "input"),
+                        help="Directory of input excels (default: ../input)")
+    parser.add_argument("-o", "--output", default=os.path.join(os.pardir, "output"),
+                        help="Directory of output binary files and header (default: ../output)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes converting excels, 0 means one per CPU (default: 1)")
+    parser.add_argument("--chunk-rows", type=int, default=0,
+                        help="Convert excels with more rows by chunks of key groups of at least this many rows, "
+                             "the jobs then convert chunks of one excel at a time (default: 0, disabled)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Convert every excel, without looking up or storing the build cache")
+    parser.add_argument("--cache-dir", help="Directory of the build cache (default: <output>/.cache)")
+    parser.add_argument("--cache-max-size", type=int, default=256,
+                        help="Size limit of the build cache in MB (default: 256)")
+    parser.add_argument("--cache-max-age", type=int, default=30,
+                        help="Days an unused build cache entry is kept (default: 30)")
+    parser.add_argument("--checksum", choices=sorted(CHECKSUM_ALGORITHMS), default=DEFAULT_CHECKSUM,
+                        help="Checksum algorithm of binary files (default: %s)" %DEFAULT_CHECKSUM)
+    parser.add_argument("--checksum-for", action="append", default=[], metavar="EXCEL=CHECKSUM",
+                        help="Checksum algorithm of the binary file of one excel, may be repeated")
+    parser.add_argument("--sheet", type=sheet_arg, default=0,
+                        help="Name or index of the calibration sheet of excels (default: 0, the 1st sheet)")
+    parser.add_argument("--sheet-for", action="append", default=[], metavar="EXCEL=SHEET",
+                        help="Name or index of the calibration sheet of one excel, may be repeated")
+    parser.add_argument("--indexed", action="store_true",
+                        help="Append a key directory sorted by Key ID to binary files, for lookup by binary search")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep a sidecar index of row digests per excel in <output>/.index, so that only the "
+                             "changed key groups of a changed excel are converted again")
+    parser.add_argument("--profile", action="store_true",
+                        help="Record time and counters of each stage per excel to <output>/profile.json")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running, reconverting excels whose mtime or size changes on warm worker processes")
+    parser.add_argument("--socket", help="Unix socket serving conversion requests in watch mode, see watcher.py")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds between polls of input directory in watch mode (default: 1.0)")
+    args = parser.parse_args()
+    start_time = time.time()
+    checksum_for = {}
+    for item in args.checksum_for:
+        excel, sep, checksum = item.rpartition('=')
+        if not sep or checksum not in CHECKSUM_ALGORITHMS:
+            parser.error("invalid --checksum-for: %s" %item)
+        checksum_for[excel] = checksum
+    sheet_for = {}
+    for item in args.sheet_for:
+        excel, sep, sheet = item.rpartition('=')
+        if not sep or not sheet:
+            parser.error("invalid --sheet-for: %s" %item)
+        sheet_for[excel] = sheet_arg(sheet)
+
     # Define path name
-    if platform.system() == "Linux":
-        INPUT_DIR_NAME = '../input/'
-        OUTPUT_DIR_NAME = '../output/'
-    elif platform.system() == "Windows":
-        INPUT_DIR_NAME = "..\\input\\"
-        OUTPUT_DIR_NAME = "..\\output\\"
-    HEADER_FILE_NAME = "header.h"
-    # Remove existing .h file
-    if os.path.exists(OUTPUT_DIR_NAME + HEADER_FILE_NAME):
-            os.remove(OUTPUT_DIR_NAME + HEADER_FILE_NAME)
-
-    # Iterate over input excels
+    INPUT_DIR_NAME = args.input
+    OUTPUT_DIR_NAME = args.output
+    header_file = os.path.join(OUTPUT_DIR_NAME, HEADER_FILE_NAME)
+
+    # Iterate over input excels(sorted, so that header file has a fixed order)
     excels = os.listdir(INPUT_DIR_NAME)
-    excels = [excel for excel in excels if (excel.endswith(".xlsx") or excel.endswith(".xls"))]
-    for excel in excels:
-        print "************************\nProcessing Excel: %s\n************************" %(excel)
-        # Read input excel
-        excel_file = os.path.abspath(INPUT_DIR_NAME+excel)
-        book = xlrd.open_workbook(excel_file)
-        sheet = book.sheet_by_index(0)
-        # Get the column index of each field
-        key_idx = sheet.row_values(1).index('Key ID')
-        value_idx = sheet.row_values(1).index('Factory Default (N-Value) Hex')
-        length_idx = sheet.row_values(1).index('Item length')
-        cali_idx = sheet.row_values(1).index('Calibration Name')
-        name_idx = sheet.row_values(1).index('Key Name')
-        # Get the end line number
-        end_line = len(sheet.col(cali_idx))
-
-        # Create binary file
-        with open(OUTPUT_DIR_NAME+excel[:excel.index('.')]+'.bin', 'wb') as f:
-            print "Generation %s.bin..." %(excel[:excel.index('.')])
-            # Iterate over each row
-            output = []
-            for row_count in range(2, end_line-1):
-                row = sheet.row(row_count)
-                if row[key_idx].ctype is not xlrd.XL_CELL_EMPTY:                 # If every row has consistent format, just check if it is empty
-                    # Input: [1(keyid), 16(length), '7'(value)]
-                    fragment = binary_converter(row[key_idx], row[length_idx],row[value_idx])
-                    # Output: ['\x0001'(keyid), '\x00\x10'(length), '\x00\x07'(value)]
-                    output.append(fragment)
-
-            # Merge fragments with same id to one fragment
-            merge_fragment(output)
-            # Manipulate the 1st fragment(Striping length & keyid infos, fill in checksum)
-            fill_header(output)
-            # Write to binary file
-            output = [''.join(fragment) for fragment in output]
-            output = ''.join(output)
-            f.write(output)
-
-        # Create header file
-        with open(OUTPUT_DIR_NAME+HEADER_FILE_NAME, 'a') as f:
-            #print "Generation %s.h..." %(excel[:excel.index('.')])
+    excels = sorted([excel for excel in excels if (excel.endswith(".xlsx") or excel.endswith(".xls"))])
+    excel_files = [os.path.abspath(os.path.join(INPUT_DIR_NAME, excel)) for excel in excels]
+
+    # Unchanged excels are copied from build cache
+    cache = None
+    if not args.no_cache:
+        cache = BuildCache(args.cache_dir or os.path.join(OUTPUT_DIR_NAME, ".cache"),
+                           args.cache_max_size * 1024 * 1024, args.cache_max_age * 24 * 3600)
+    jobs = args.jobs if args.jobs > 0 else multiprocessing.cpu_count()
+    convert = functools.partial(convert_excel_checked, cache=cache, profile=args.profile,
+                                checksum=args.checksum, checksum_for=checksum_for,
+                                sheet=args.sheet, sheet_for=sheet_for, indexed=args.indexed,
+                                index_dir=os.path.join(OUTPUT_DIR_NAME, ".index") if args.incremental else None)
+    if args.chunk_rows > 0:
+        # Worker processes convert chunks of one excel, instead of whole excels
+        convert = functools.partial(convert, jobs=jobs, chunk_rows=args.chunk_rows)
+
+    if args.watch:
+        from watcher import Watcher
+        if args.socket and not hasattr(socket, 'AF_UNIX'):
+            parser.error("--socket needs Unix sockets, not supported on this platform")
+        watcher = Watcher(INPUT_DIR_NAME, OUTPUT_DIR_NAME, convert, 1 if args.chunk_rows > 0 else jobs, cache)
+        watcher.serve(args.socket, args.interval)
+        sys.exit(0)
+
+    # Convert excels in worker processes, results are yielded in the order of excels
+    # Header of all excels is written to one file, which replaces the existing header when all are written
+    header_sink = open("%s.%d.tmp" %(header_file, os.getpid()), 'w')
+    pool = None
+    if jobs == 1 or args.chunk_rows > 0:
+        # Excels are converted in this process one by one, each writes its header to the sink
+        results = itertools.imap(functools.partial(convert, header_sink=header_sink), excel_files)
+    else:
+        pool = multiprocessing.Pool(jobs)
+        results = pool.imap(convert, excel_files)
+
+    reports = OrderedDict()
+    invalid = OrderedDict()
+    key_names = []
+    decoders = []
+    try:
+        for excel, (bin_content, header_content, names_content, decoders_content, report,
+                    violations) in itertools.izip(excels, results):
+            print "************************\nProcessing Excel: %s\n************************" %(excel)
+            if violations:
+                # Report every violation, keep on with other excels
+                print "Invalid Excel: %d violation(s)" %len(violations)
+                for violation in violations:
+                    print "  row %(row)d, %(column)s: %(message)s" %violation
+                print
+                invalid[excel] = violations
+                continue
+            # Create binary file
+            with open(os.path.join(OUTPUT_DIR_NAME, excel[:excel.index('.')]+'.bin'), 'wb') as f:
+                print "Generation %s.bin..." %(excel[:excel.index('.')])
+                f.write(bin_content)
+
+            # Append to header file
             print "Generation/Appending %s...\n" %(HEADER_FILE_NAME)
-            # Iterate over each row
-            output = []
-            for row_count in range(2, end_line-1):
-                row = sheet.row(row_count)
-                if row[key_idx].ctype is not xlrd.XL_CELL_EMPTY:
-                    # Input: Calibration, Keylength, KeyName
-                    fragment = preprocess(row[cali_idx], row[length_idx], row[name_idx])
-                    output.append(fragment)
-            # generate header
-            content = gen_header(output)
-            f.write(content)
+            if header_content is not None:
+                header_sink.write(header_content)
+            key_names.append(parse_key_names(names_content))
+            decoders.append((excel, decoders_content))
+            reports[excel] = report
+    except:
+        header_sink.close()
+        os.remove(header_sink.name)
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if cache is not None:
+            cache.evict()
+    header_sink.close()
+    if reports:
+        rename_over(header_sink.name, header_file)
+    else:
+        os.remove(header_sink.name)
+        replace_file(header_file, None)
+
+    validation_file = write_run_files(OUTPUT_DIR_NAME, key_names, decoders, invalid)
 
+    if args.profile:
+        with open(os.path.join(OUTPUT_DIR_NAME, "profile.json"), 'w') as f:
+            json.dump(OrderedDict([('version', EXCHANGER_VERSION),
+                                   ('jobs', args.jobs),
+                                   ('time', time.time() - start_time),
+                                   ('excels', reports)]), f, indent=2, separators=(',', ': '))
+    if invalid:
+        sys.exit("%d invalid excel(s), see %s" %(len(invalid), validation_file))
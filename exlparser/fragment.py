@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 07:03:26 PM CET
+
+from array import array
+
+from scale import binary_real_to_dec_int, dec_int_to_binary_real
+from bitstream import BitWriter
+
+class FragmentTable(object):
+    """Table of fragments stored column by column, instead of a list of [key_bin, length_bin, value_bin].
+
+    keys: array('H') of Key ID
+    lengths: array('I') of bit length
+    values: bytearray of all values, one after another
+    offsets: array('I') of start offset of each value in values, followed by end offset of the last value
+    """
+
+    def __init__(self):
+        self.keys = array('H')
+        self.lengths = array('I')
+        self.values = bytearray()
+        self.offsets = array('I', [0])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def append(self, key, length, value):
+        """Append a fragment.
+
+        :param key: Key ID(int).
+        :param length: Bit length(int).
+        :param value: Value binary.
+        :return: None
+        """
+        self.keys.append(key)
+        self.lengths.append(length)
+        self.values += value
+        self.offsets.append(len(self.values))
+        return None
+
+    def append_fragment(self, fragment):
+        """Append a fragment of format [key_bin, length_bin, value_bin].
+
+        :param fragment: Fragment.
+        :return: None
+        """
+        self.append(binary_real_to_dec_int(fragment[0]), binary_real_to_dec_int(fragment[1]), fragment[2])
+        return None
+
+    def value(self, index):
+        """
+        :param index: Index of fragment.
+        :return: memoryview of value of the fragment.
+        """
+        return memoryview(self.values)[self.offsets[index]:self.offsets[index+1]]
+
+    def fragment(self, index):
+        """
+        :param index: Index of fragment.
+        :return: Fragment of format [key_bin, length_bin, value_bin].
+        """
+        return [dec_int_to_binary_real(self.keys[index], 16),
+                dec_int_to_binary_real(int(self.lengths[index]), 16),
+                self.value(index).tobytes()]
+
+    @classmethod
+    def from_fragments(cls, fragments):
+        """
+        :param fragments: List of fragment of format [key_bin, length_bin, value_bin].
+        :return: FragmentTable.
+        """
+        table = cls()
+        for fragment in fragments:
+            table.append_fragment(fragment)
+        return table
+
+    def to_fragments(self):
+        """
+        :return: List of fragment of format [key_bin, length_bin, value_bin].
+        """
+        return [self.fragment(index) for index in range(len(self))]
+
+    def merge(self):
+        """Merge fragments with same id to one fragment, in one pass.
+
+        Fragments with same id must be contiguous. Values of fragments whose bit-length is not 8's multiple are
+        packed as bit fields(first one at the most significant bit), each run of bit fields should fill whole
+        bytes.
+
+        :return: Merged FragmentTable.
+        """
+        merged = FragmentTable()
+        writer = BitWriter(merged.values)
+        keys, lengths, offsets, values = self.keys, self.lengths, self.offsets, self.values
+        merged_keys = set()
+        count = len(keys)
+        index = 0
+
+        while index < count:
+            key = keys[index]
+            if key in merged_keys:
+                raise ValueError("Fragments of Key ID %04X are not contiguous" %key)
+            merged_keys.add(key)
+            length_sum = 0   #(bit)
+            while index < count and keys[index] == key:
+                length = lengths[index]
+                # 1. Merge length
+                length_sum += length
+                # 2. Merge value
+                if length % 8 != 0:
+                    # Bit field
+                    num = 0
+                    for byte in values[offsets[index]:offsets[index+1]]:
+                        num = (num << 8) | byte
+                    writer.write(num, length)
+                else:
+                    if not writer.aligned():
+                        raise ValueError("Bit fields of Key ID %04X do not fill whole bytes" %key)
+                    merged.values += values[offsets[index]:offsets[index+1]]
+                index += 1
+            # Till last item still bit field
+            if not writer.aligned():
+                raise ValueError("Bit fields of Key ID %04X do not fill whole bytes" %key)
+            merged.keys.append(key)
+            merged.lengths.append(length_sum)
+            merged.offsets.append(len(merged.values))
+        return merged
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 04:12:46 AM CET
+
+"""Sidecar index of an excel for incremental conversion.
+
+Rows are grouped by Key ID, each group is digested over the five columns exchanger reads. The index keeps, for
+each key group of the last conversion, its digest, encoded content(the header for the 1st group, records for the
+others), header entries and the state of the Sum16 accumulator fed with its content. When the excel changes,
+only groups whose digest changed are converted again, see exchanger.convert_sheet_incremental().
+"""
+
+import os
+import hashlib
+import cPickle
+from collections import namedtuple
+
+import xlrd
+from xlrd.sheet import Cell
+from codec import RowCodec
+
+INDEX_SUFFIX = '.idx'
+
+# Key group of the last conversion: Key ID, digest of rows, whether it is the header, encoded content, header
+# entries and state of Sum16 accumulator(None for other checksum algorithms)
+IndexedGroup = namedtuple('IndexedGroup', 'key digest header content entries state')
+
+def scan_groups(sheet, start=2, end=None):
+    """Digest the rows of each key group, reading the five columns exchanger reads column by column.
+
+    :param sheet: Calibration sheet.
+    :param start: Index of the first row to scan.
+    :param end: Index of the row to stop at, None for the last row(end of calibration block).
+    :return: List of (Key ID, digest, start row, end row) of each key group, in the order of rows.
+    """
+    codec = RowCodec(sheet.row_values(1))
+    if end is None:
+        end = len(sheet.col(codec.cali_idx)) - 1
+    columns = (codec.key_idx, codec.length_idx, codec.value_idx, codec.cali_idx, codec.name_idx)
+    types = [sheet.col_types(colx, start, end) for colx in columns]
+    values = [sheet.col_values(colx, start, end) for colx in columns]
+    key_types, key_values = types[0], values[0]
+    rows = zip(*(types + values))
+
+    groups = []
+    seen_keys = set()
+    key = group_start = None
+    last_cell = None
+    group_rows = []
+    for offset in xrange(len(rows)):
+        ctype = key_types[offset]
+        if ctype == xlrd.XL_CELL_EMPTY:
+            continue
+        # Key ID is only decoded when the cell differs from the last one
+        if (ctype, key_values[offset]) != last_cell:
+            last_cell = (ctype, key_values[offset])
+            row_key = codec.key(Cell(ctype, key_values[offset]))
+            if row_key != key:
+                if key is not None:
+                    groups.append((key, hashlib.sha1(repr(group_rows)).digest(), group_start, start + offset))
+                if row_key in seen_keys:
+                    raise ValueError("Rows of Key ID %04X are not contiguous" %row_key)
+                seen_keys.add(row_key)
+                key, group_start, group_rows = row_key, start + offset, []
+        group_rows.append(rows[offset])
+    if key is not None:
+        groups.append((key, hashlib.sha1(repr(group_rows)).digest(), group_start, end))
+    return groups
+
+def load_index(path, stamp):
+    """
+    :param path: Path of the index.
+    :param stamp: Version and settings the index has to be saved with.
+    :return: Dict of Key ID to IndexedGroup, empty if there is no usable index.
+    """
+    try:
+        with open(path, 'rb') as f:
+            saved_stamp, groups = cPickle.load(f)
+    except Exception:
+        # Missing or broken index, all groups are converted
+        return {}
+    if saved_stamp != stamp:
+        return {}
+    return dict((group[0], IndexedGroup(*group)) for group in groups)
+
+def save_index(path, stamp, groups):
+    """Save index, renamed into place so that a concurrent run never reads a partial index.
+
+    :param path: Path of the index.
+    :param stamp: Version and settings of the conversion.
+    :param groups: List of IndexedGroup.
+    :return: None
+    """
+    index_dir = os.path.dirname(path)
+    if index_dir and not os.path.isdir(index_dir):
+        try:
+            os.makedirs(index_dir)
+        except OSError:
+            if not os.path.isdir(index_dir):
+                raise
+    tmp_path = "%s.%d.tmp" %(path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        # Plain tuples, so that the index does not depend on the module path of IndexedGroup
+        cPickle.dump((stamp, [tuple(group) for group in groups]), f, cPickle.HIGHEST_PROTOCOL)
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(tmp_path, path)
+    return None
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 12:48:15 AM CET
+
+"""Header B: table mapping Key ID to Key Name across all excels, sorted by Key ID for binary search."""
+
+import itertools
+
+KEY_NAME_MAP_FILE_NAME = "diagCalibrationKeyNameMap.h"
+
+def collect_key_names(keys, entries):
+    """Pair each key of a sheet with its Key Name. Keys of the calibration header(low byte of Key ID is 0) and
+    keys without Key Name are excluded.
+
+    :param keys: Key ID of each row.
+    :param entries: Header entry [cali, keyLength, keyName] of each row.
+    :return: List of (Key ID, Key Name), in the order of rows.
+    """
+    pairs = []
+    last_key = None
+    for key, entry in itertools.izip(keys, entries):
+        if key == last_key:
+            continue
+        last_key = key
+        if key & 0xFF == 0 or not entry[2]:
+            continue
+        pairs.append((key, entry[2]))
+    return pairs
+
+def format_key_names(pairs):
+    """
+    :param pairs: List of (Key ID, Key Name).
+    :return: Text of lines 'KEYID<TAB>Key Name'.
+
+    >>> format_key_names([(0x0701, 'ERG_KEY1'), (0x0C02, 'ERG_KEY2')])
+    '0701\\tERG_KEY1\\n0C02\\tERG_KEY2\\n'
+    """
+    return ''.join(["%04X\t%s\n" %(key, name) for key, name in pairs])
+
+def parse_key_names(content):
+    """
+    :param content: Text made by format_key_names().
+    :return: List of (Key ID, Key Name).
+    """
+    pairs = []
+    for line in content.splitlines():
+        key, name = line.split('\t', 1)
+        pairs.append((int(key, 16), name))
+    return pairs
+
+def merge_key_names(pair_lists):
+    """Merge keys of all excels, a Key ID named differently by excels keeps its 1st name.
+
+    :param pair_lists: Lists of (Key ID, Key Name) of each excel.
+    :return: List of (Key ID, Key Name) sorted by Key ID.
+    """
+    names = {}
+    for pairs in pair_lists:
+        for key, name in pairs:
+            if key not in names:
+                names[key] = name
+            elif names[key] != name:
+                print "WARNING: Key ID %04X is named both %s and %s, keeping %s" %(key, names[key], name, names[key])
+    return sorted(names.iteritems())
+
+def gen_key_name_map(pairs):
+    """Generate header B, with the table sorted by Key ID and a binary search helper over it.
+
+    :param pairs: List of (Key ID, Key Name) sorted by Key ID.
+    :return: String to be writen to file.
+    """
+    content = "#ifndef DIAG_CALIBRATION_KEY_NAME_MAP_H\n#define DIAG_CALIBRATION_KEY_NAME_MAP_H\n\n"
+    content += "typedef struct s_diagKeyid2KeyName\n{\n\tchar Key_id[2];\n\tchar *pKey_name;\n} diagKeyid2KeyName;\n\n"
+    content += "#define KEYID2KEYNAME_TABLE_SIZE %d\n\n" %len(pairs)
+    # Sorted by Key ID
+    content += "diagKeyid2KeyName keyid2keyname_table[] = {\n"
+    content += ''.join(["\t{{0x%02X, 0x%02X}, \"%s\"},\n" %(key >> 8, key & 0xFF, name) for key, name in pairs])
+    content += "};\n\n"
+    content += ("/* Key Name of Key ID by binary search, 0 if not found */\n"
+                "static const char *diagKeyid2KeyName_lookup(unsigned short key_id)\n{\n"
+                "\tint low = 0;\n"
+                "\tint high = KEYID2KEYNAME_TABLE_SIZE - 1;\n"
+                "\twhile (low <= high)\n\t{\n"
+                "\t\tint middle = (low + high) / 2;\n"
+                "\t\tunsigned short middle_id = ((unsigned char)keyid2keyname_table[middle].Key_id[0] << 8) |\n"
+                "\t\t                           (unsigned char)keyid2keyname_table[middle].Key_id[1];\n"
+                "\t\tif (middle_id < key_id)\n\t\t\tlow = middle + 1;\n"
+                "\t\telse if (middle_id > key_id)\n\t\t\thigh = middle - 1;\n"
+                "\t\telse\n\t\t\treturn keyid2keyname_table[middle].pKey_name;\n"
+                "\t}\n\treturn 0;\n}\n\n")
+    content += "#endif\n"
+    return content
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 10:58:20 PM CET
+
+"""Decoder & verifier of binary files written by exchanger.
+
+Usage: python reader.py [-j JOBS] [--checksum NAME] [--indexed] [--input EXCEL_DIR [--sheet SHEET]] [BIN_OR_DIR ...]
+Every .bin is verified, problems of all files are printed and the exit status is 1 if any file is broken.
+"""
+
+import os
+import sys
+import argparse
+import multiprocessing
+import itertools
+from collections import namedtuple, OrderedDict
+
+from checksums import Sum16, BYTE, sum16, new_checksum, CHECKSUM_ALGORITHMS, DEFAULT_CHECKSUM
+from writer import CHECKSUM_PACKERS, KEY_LENGTH, DIRECTORY_ENTRY, DIRECTORY_TRAILER, DIRECTORY_MAGIC
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Bytes of the header(value of key group 0, starting with checksum)
+HEADER_SIZE = 14
+# Least byte count summed by NumPy, below it unpacking by struct is as fast
+NUMPY_MIN_SIZE = 64 * 1024
+
+# Record of a key: Key ID, bit length and memoryview of value
+Record = namedtuple('Record', 'key length value')
+
+def word_sum(data):
+    """Sum big-endian 16-bit words of data, padding the odd byte with '\\x00'. NumPy sums it when available.
+
+    :param data: String or bytearray.
+    :return: Sum(not truncated).
+
+    >>> word_sum('\\x12\\x34\\x77\\x88\\x01')
+    35516
+    """
+    if numpy is None or len(data) < NUMPY_MIN_SIZE:
+        return sum16(data)
+    word_count = len(data) / 2
+    total = int(numpy.frombuffer(data, dtype='>u2', count=word_count).sum(dtype=numpy.uint64))
+    if len(data) % 2 != 0:
+        total += BYTE.unpack_from(data, len(data) - 1)[0] << 8
+    return total
+
+class BinReader(object):
+    """Reader walking binary file content through a memoryview, without copying values.
+
+    Binary file format:
+    |Value of 1st fragment(header, starting with checksum)|KEY(2 bytes)|LENGTH(2 bytes)|VALUE|...
+    Indexed binary file has a key directory after the records, see BinWriter.write_directory().
+    """
+
+    def __init__(self, data, header_size=HEADER_SIZE, indexed=False):
+        """
+        :param data: Binary file content, string or bytearray.
+        :param header_size: Bytes of the header.
+        :param indexed: Whether the file has a key directory.
+        """
+        self.data = data
+        self.view = memoryview(data)
+        self.header_size = header_size
+        if len(self.view) < header_size:
+            raise ValueError("File is shorter than %d-byte header" %header_size)
+        self.header = self.view[:header_size]
+        # End offset of records, start offset and entry count of key directory
+        self.records_end = len(self.view)
+        self.directory_offset = None
+        self.directory_count = 0
+        if indexed:
+            size = len(self.view)
+            if size < header_size + DIRECTORY_TRAILER.size:
+                raise ValueError("Key directory is missing")
+            records_end, count, magic = DIRECTORY_TRAILER.unpack_from(data, size - DIRECTORY_TRAILER.size)
+            if magic != DIRECTORY_MAGIC:
+                raise ValueError("Key directory is missing")
+            offset = records_end + (-records_end % 4)
+            if records_end < header_size or offset + count * DIRECTORY_ENTRY.size + DIRECTORY_TRAILER.size != size:
+                raise ValueError("Key directory does not fit the file")
+            self.records_end = records_end
+            self.directory_offset = offset
+            self.directory_count = count
+
+    def records(self):
+        """Yield records following the header.
+
+        :return: Generator of Record, raising ValueError when a record is truncated.
+        """
+        view = self.view
+        end = self.records_end
+        offset = self.header_size
+        while offset < end:
+            if end - offset < KEY_LENGTH.size:
+                raise ValueError("Truncated record at offset %d" %offset)
+            key, length = KEY_LENGTH.unpack_from(self.data, offset)
+            offset += KEY_LENGTH.size
+            size = (length + 7) / 8
+            if end - offset < size:
+                raise ValueError("Value of Key ID %04X at offset %d is truncated" %(key, offset))
+            yield Record(key, length, view[offset:offset+size])
+            offset += size
+
+    def directory(self):
+        """
+        :return: List of directory entries (Key ID, offset of value, bytes of value), sorted by Key ID.
+        """
+        offset = self.directory_offset
+        return [DIRECTORY_ENTRY.unpack_from(self.data, offset + index * DIRECTORY_ENTRY.size)
+                for index in xrange(self.directory_count)]
+
+    def find(self, key):
+        """Look up a key by binary search of the key directory, in O(log n).
+
+        :param key: Key ID.
+        :return: Record of the key, None if not found.
+        """
+        if self.directory_offset is None:
+            raise ValueError("Binary file is not indexed")
+        low, high = 0, self.directory_count
+        while low < high:
+            middle = (low + high) / 2
+            entry_key, offset, size = DIRECTORY_ENTRY.unpack_from(self.data, self.directory_offset +
+                                                                  middle * DIRECTORY_ENTRY.size)
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                length = KEY_LENGTH.unpack_from(self.data, offset - KEY_LENGTH.size)[1]
+                return Record(key, length, self.view[offset:offset+size])
+        return None
+
+    def stored_checksum(self, checksum=DEFAULT_CHECKSUM):
+        """
+        :param checksum: Name of checksum algorithm.
+        :return: Checksum stored in the header.
+        """
+        size = new_checksum(checksum).size
+        return CHECKSUM_PACKERS[size].unpack_from(self.data, 0)[0]
+
+    def check_checksum(self, checksum=DEFAULT_CHECKSUM):
+        """
+        :param checksum: Name of checksum algorithm.
+        :return: True if the stored checksum matches the content.
+        """
+        accumulator = new_checksum(checksum)
+        if isinstance(accumulator, Sum16):
+            # The stored checksum is the two's complement, so all words including it sum up to 0
+            return word_sum(self.data) & 0xFFFF == 0
+        accumulator.update(self.view[accumulator.size:])
+        return accumulator.digest() == self.stored_checksum(checksum)
+
+    def verify(self, checksum=DEFAULT_CHECKSUM, layout=None):
+        """Verify checksum and records.
+
+        :param checksum: Name of checksum algorithm.
+        :param layout: Dict of Key ID to expected bit length, None to skip comparing.
+        :return: List of problems, empty if the content is intact.
+        """
+        problems = []
+        if not self.check_checksum(checksum):
+            problems.append("Checksum %X does not match content" %self.stored_checksum(checksum))
+        keys = set()
+        # Directory entries of the records
+        entries = []
+        offset = self.header_size
+        try:
+            for key, length, value in self.records():
+                offset += KEY_LENGTH.size
+                entries.append((key, offset, len(value)))
+                offset += len(value)
+                if key in keys:
+                    problems.append("Key ID %04X is duplicated" %key)
+                keys.add(key)
+                if length % 8 != 0:
+                    problems.append("Bit-length %d of Key ID %04X is not whole bytes" %(length, key))
+                if layout is not None:
+                    if key not in layout:
+                        problems.append("Key ID %04X is not in layout" %key)
+                    elif layout[key] != length:
+                        problems.append("Bit-length of Key ID %04X is %d, not %d" %(key, length, layout[key]))
+        except ValueError as error:
+            problems.append(str(error))
+        if layout is not None:
+            for key in sorted(set(layout) - keys):
+                problems.append("Key ID %04X is missing" %key)
+        if self.directory_offset is not None and self.directory() != sorted(entries):
+            problems.append("Key directory does not match records")
+        return problems
+
+def layout_of(excel_file, sheet=0):
+    """Get the record layout from the excel a binary file is converted from.
+
+    :param excel_file: Path of the excel.
+    :param sheet: Name or index of the calibration sheet.
+    :return: Dict of Key ID to bit length, excluding the header.
+    """
+    from exchanger import open_sheet, parse_sheet
+    book, sheet = open_sheet(excel_file, sheet)
+    try:
+        merged = parse_sheet(sheet).fragments.merge()
+    finally:
+        book.unload_sheet(sheet.number)
+    return dict(zip(merged.keys[1:], [int(length) for length in merged.lengths[1:]]))
+
+def verify_file(bin_file, checksum=DEFAULT_CHECKSUM, excel_file=None, header_size=HEADER_SIZE, indexed=False,
+                sheet=0):
+    """
+    :param bin_file: Path of the binary file.
+    :param checksum: Name of checksum algorithm.
+    :param excel_file: Path of the excel it is converted from, None to skip comparing layout.
+    :param header_size: Bytes of the header.
+    :param indexed: Whether the file has a key directory.
+    :param sheet: Name or index of the calibration sheet of the excel.
+    :return: List of problems, empty if the file is intact.
+    """
+    with open(bin_file, 'rb') as f:
+        data = f.read()
+    try:
+        reader = BinReader(data, header_size, indexed)
+    except ValueError as error:
+        return [str(error)]
+    layout = layout_of(excel_file, sheet) if excel_file is not None else None
+    return reader.verify(checksum, layout)
+
+def _verify_task(task):
+    return verify_file(*task)
+
+def verify_files(bin_files, checksum=DEFAULT_CHECKSUM, excel_files=None, header_size=HEADER_SIZE, jobs=1,
+                 indexed=False, sheet=0):
+    """Verify binary files, in worker processes if jobs is not 1.
+
+    :param bin_files: List of paths of binary files.
+    :param checksum: Name of checksum algorithm.
+    :param excel_files: List of paths of excels(or None) the files are converted from, None to skip all.
+    :param header_size: Bytes of the header.
+    :param jobs: Number of worker processes, 0 means one per CPU.
+    :param indexed: Whether the files have a key directory.
+    :param sheet: Name or index of the calibration sheet of the excels.
+    :return: OrderedDict of path to list of problems, in the order of bin_files.
+    """
+    if excel_files is None:
+        excel_files = [None] * len(bin_files)
+    tasks = [(bin_file, checksum, excel_file, header_size, indexed, sheet)
+             for bin_file, excel_file in zip(bin_files, excel_files)]
+    if jobs == 1:
+        results = itertools.imap(_verify_task, tasks)
+        return OrderedDict(itertools.izip(bin_files, results))
+    pool = multiprocessing.Pool(jobs if jobs > 0 else None)
+    try:
+        return OrderedDict(itertools.izip(bin_files, pool.imap(_verify_task, tasks, chunksize=16)))
+    finally:
+        pool.close()
+        pool.join()
+
+#-----------------------------------
+#               Main
+#-----------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify binary files generated by exchanger.")
+    parser.add_argument("paths", nargs="*", default=[os.path.join(os.pardir, "output")],
+                        help="Binary files or directories of them (default: ../output)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes, 0 means one per CPU (default: 1)")
+    parser.add_argument("--checksum", choices=sorted(CHECKSUM_ALGORITHMS), default=DEFAULT_CHECKSUM,
+                        help="Checksum algorithm of binary files (default: %s)" %DEFAULT_CHECKSUM)
+    parser.add_argument("--header-size", type=int, default=HEADER_SIZE,
+                        help="Bytes of the header (default: %d)" %HEADER_SIZE)
+    parser.add_argument("--indexed", action="store_true", help="Binary files have a key directory")
+    parser.add_argument("--input", help="Directory of excels, to compare records with the excel of the same name")
+    parser.add_argument("--sheet", default="0",
+                        help="Name or index of the calibration sheet of the excels (default: 0)")
+    args = parser.parse_args()
+
+    bin_files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            bin_files += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".bin"))
+        else:
+            bin_files.append(path)
+    excel_files = None
+    if args.input:
+        excels = dict((os.path.splitext(name)[0], os.path.join(args.input, name)) for name in os.listdir(args.input)
+                      if name.endswith(".xlsx") or name.endswith(".xls"))
+        excel_files = [excels.get(os.path.splitext(os.path.basename(bin_file))[0]) for bin_file in bin_files]
+    sheet = 0
+    if args.input:
+        # Excels are only read(by exchanger) to compare layout
+        from exchanger import sheet_arg
+        sheet = sheet_arg(args.sheet)
+
+    results = verify_files(bin_files, args.checksum, excel_files, args.header_size, args.jobs, args.indexed, sheet)
+    broken = 0
+    for bin_file, problems in results.iteritems():
+        print "%s: %s" %(bin_file, "OK" if not problems else "BROKEN")
+        for problem in problems:
+            print "  %s" %problem
+        broken += bool(problems)
+    print "%d file(s) verified, %d broken" %(len(results), broken)
+    sys.exit(1 if broken else 0)
@@ -4,6 +4,36 @@
 # Created Time: Mon 22 Dec 2014 08:16:38 AM CET
 
 import binascii
+import struct
+
+# Packers of common bit lengths
+PACKERS = {8: struct.Struct('>B'), 16: struct.Struct('>H'), 32: struct.Struct('>I'), 64: struct.Struct('>Q')}
+# Unpackers of common byte lengths
+UNPACKERS = {1: struct.Struct('>B'), 2: struct.Struct('>H'), 4: struct.Struct('>I'), 8: struct.Struct('>Q')}
+# Encoded binaries of small(most frequent, e.g. 0 & 0xFF) values, keyed by (value, bit length)
+MEMO_LIMIT = 0x100
+MEMO = {}
+
+def encode_fixed(num, length):
+    """Encode non-negative integer to big-endian binary of length/8 bytes.
+
+    :param num: Non-negative integer, which fits in length bits.
+    :param length: Bit length, 8's multiple.
+    :return: Binary.
+
+    >>> encode_fixed(500, 24)
+    '\\x00\\x01\\xf4'
+    """
+    if num < MEMO_LIMIT:
+        binary = MEMO.get((num, length))
+        if binary is None:
+            binary = MEMO[(num, length)] = binascii.a2b_hex('%0*x' %(length/4, num))
+        return binary
+    packer = PACKERS.get(length)
+    if packer is not None:
+        return packer.pack(num)
+    # Generic path for wide fields
+    return binascii.a2b_hex('%0*x' %(length/4, num))
 
 def dec_int_to_binary_real(num, length = None):
     """Convert decimal integer to binary with fixed bit length
@@ -18,6 +48,8 @@ def dec_int_to_binary_real(num, length = None):
     """
     if type(num) is not type(0):
         raise TypeError("Type of argumnet is not integer!")
+    if num >= 0 and type(length) is type(0) and length % 8 == 0 and (num.bit_length() or 1) <= length:
+        return encode_fixed(num, length)
     str_hex = hex(num)[2:]
     # Pad a leading 0 if str_hex is not even length
     if len(str_hex) % 2 == 1:
@@ -40,6 +72,9 @@ def binary_real_to_dec_int(bin_num):
     >>> binary_real_to_dec_int('\x01\xf4')
     500
     """
+    unpacker = UNPACKERS.get(len(bin_num))
+    if unpacker is not None:
+        return unpacker.unpack(bin_num)[0]
     return int(binascii.b2a_hex(bin_num), 16)
 
 def hex_int_to_dec_int(hex_num):
@@ -128,6 +163,11 @@ def int_repr_to_binary_real(num, length=None):
     """
     if type(num) is not type(0):
         raise TypeError("Type of argument is not integer!")
+    if num >= 0 and type(length) is type(0) and length % 8 == 0 and (num.bit_length() or 1) <= length:
+        # Decimal digits of num are hex digits of the value
+        value = int(str(num), 16)
+        if value.bit_length() <= length:
+            return encode_fixed(value, length)
     tmp = num
     if tmp == 0:
         l = [0]
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 10:02:11 AM CET
+# File Name: test_cache.py
+# Description:
+#########################################################################
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from exlparser.cache import BuildCache, cache_key
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache_key(self):
+        key = cache_key('content', '1.0', ('Key ID', 'Key Name'))
+        self.assertEqual(key, cache_key('content', '1.0', ('Key ID', 'Key Name')))
+        self.assertNotEqual(key, cache_key('content!', '1.0', ('Key ID', 'Key Name')))
+        self.assertNotEqual(key, cache_key('content', '1.1', ('Key ID', 'Key Name')))
+        self.assertNotEqual(key, cache_key('content', '1.0', ('Key ID', 'Item length')))
+
+    def test_get_put(self):
+        cache = BuildCache(self.cache_dir)
+        self.assertEqual(cache.get('k'), None)
+        cache.put('k', '\x94\x4c\x00', 'typedef struct s_A\n')
+        self.assertEqual(cache.get('k'), ('\x94\x4c\x00', 'typedef struct s_A\n'))
+        cache.put('n', '\x94\x4c\x00', 'typedef struct s_A\n', '0701\tERG_A\n')
+        self.assertEqual(cache.get('n'), ('\x94\x4c\x00', 'typedef struct s_A\n', '0701\tERG_A\n'))
+        cache.put('d', '\x94\x4c\x00', 'typedef struct s_A\n', '0701\tERG_A\n', 'class ERG_A')
+        self.assertEqual(cache.get('d'), ('\x94\x4c\x00', 'typedef struct s_A\n', '0701\tERG_A\n', 'class ERG_A'))
+
+    def test_evict(self):
+        cache = BuildCache(self.cache_dir, max_size=9, max_age=3600)
+        for key in ['old', 'lru', 'new']:
+            cache.put(key, '1234', '5')
+        now = time.time()
+        os.utime(os.path.join(self.cache_dir, 'old.bin'), (now - 7200, now - 7200))
+        os.utime(os.path.join(self.cache_dir, 'lru.bin'), (now - 60, now - 60))
+        # 'old' is expired, 'lru' exceeds the size limit
+        self.assertEqual(cache.evict(), 2)
+        self.assertEqual(cache.get('old'), None)
+        self.assertEqual(cache.get('lru'), None)
+        self.assertEqual(cache.get('new'), ('1234', '5'))
+
+
+if __name__ == "__main__":
+    unittest.main()
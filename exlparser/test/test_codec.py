@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 09:48:13 PM CET
+# File Name: test_codec.py
+# Description:
+#########################################################################
+
+import unittest
+import xlrd
+from xlrd.sheet import Cell
+from exlparser.codec import COLUMNS, RowCodec
+from exlparser.exchanger import binary_converter, preprocess
+from exlparser.scale import binary_real_to_dec_int
+
+def text(value):
+    return Cell(xlrd.XL_CELL_TEXT, value)
+
+def number(value):
+    return Cell(xlrd.XL_CELL_NUMBER, float(value))
+
+class TestCodec(unittest.TestCase):
+
+    def setUp(self):
+        # Columns in another order than COLUMNS
+        self.codec = RowCodec(['Key Name', 'Calibration Name', 'Key ID', 'Factory Default (N-Value) Hex',
+                               'Item length'])
+        self.rows = [[Cell(xlrd.XL_CELL_EMPTY, ''), text(u'CHECKSUM'), number(0), number(0), number(16)],
+                     [text(u'ERG_KEY'), text(u'1st item-A'), number(701), number(1015), number(16)],
+                     [text(u'ERG_KEY'), text(u'HEX'), text(u'0C01'), text(u'1E'), number(32)],
+                     [text(u'ERG_KEY'), text(u'STRING'), text(u'0C01'), text(u'"AB"'), number(32)],
+                     [text(u'ERG_KEY'), text(u'FLAG'), text(u'0C01'), number(1), number(1)]]
+
+    def test_columns(self):
+        self.assertEqual(self.codec.key_idx, 2)
+        self.assertEqual(self.codec.name_idx, 0)
+        self.assertEqual(RowCodec(list(COLUMNS)).value_idx, 2)
+
+    def test_convert_as_converters(self):
+        for row in self.rows:
+            key, length, value_bin, entry = self.codec.convert(row)
+            fragment = binary_converter(row[2], row[4], row[3])
+            self.assertEqual(key, binary_real_to_dec_int(fragment[0]))
+            self.assertEqual(length, binary_real_to_dec_int(fragment[1]))
+            self.assertEqual(value_bin, fragment[2])
+            self.assertEqual(entry, preprocess(row[1], row[4], row[0]))
+        self.assertEqual(self.codec.convert(self.rows[1])[3][0], '_st_item_A')
+
+    def test_errors(self):
+        row = list(self.rows[1])
+        row[2] = Cell(xlrd.XL_CELL_BOOLEAN, 1)
+        self.assertRaises(TypeError, self.codec.convert, row)
+        row[2] = text(u'10000')
+        self.assertRaises(ValueError, self.codec.convert, row)
+        row = list(self.rows[1])
+        row[3] = Cell(xlrd.XL_CELL_ERROR, 0)
+        self.assertRaises(TypeError, self.codec.convert, row)
+        row = list(self.rows[1])
+        row[0] = number(1)
+        self.assertRaises(TypeError, self.codec.convert, row)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 02:10:34 AM CET
+# File Name: test_decoders.py
+# Description:
+#########################################################################
+
+import ctypes
+import unittest
+from exlparser.decoders import gen_decoders, gen_decoder_module
+
+class TestDecoders(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = [0x0700, 0x0700, 0x0701, 0x0701, 0x0701, 0x0701, 0x0702]
+        self.entries = [['CHECKSUM', 16, ''], ['MODULE_ID', 16, ''],
+                        ['ITEM_A', 16, 'ERG_KEY1'], ['BIT_A', 3, 'ERG_KEY1'], ['BIT_B', 1, 'ERG_KEY1'],
+                        ['BIT_C', 4, 'ERG_KEY1'], ['ITEM_C', 8, 'ERG KEY2']]
+        namespace = {}
+        # Another excel lays out 0x0701 differently
+        other = gen_decoders([0x0700, 0x0701], [['CHECKSUM', 16, ''], ['ITEM_B', 24, 'ERG_KEY1']])
+        exec gen_decoder_module([('test.xlsx', gen_decoders(self.keys, self.entries)),
+                                 ('other.xlsx', other)]) in namespace
+        self.module = namespace
+
+    def test_structures(self):
+        keys = self.module['EXCELS']['test.xlsx']
+        self.assertEqual(sorted(keys), [0x0701, 0x0702])
+        self.assertEqual(keys[0x0702].__name__, 'ERG_KEY2')
+        self.assertEqual(ctypes.sizeof(keys[0x0701]), 3)
+        self.assertEqual([field[0] for field in keys[0x0701]._fields_], ['ITEM_A', 'ERG_KEY1BYTE0'])
+
+    def test_records(self):
+        image = bytearray('\x00' * 4 + '\x07\x01\x00\x18\x12\x34\xb5' + '\x07\x02\x00\x08\x56' +
+                          '\x07\x03\x00\x08\x78')
+        records = list(self.module['records'](image, 'test.xlsx', header_size=4))
+        self.assertEqual([key for key, record in records], [0x0701, 0x0702, 0x0703])
+        record = records[0][1]
+        self.assertEqual(list(record.ITEM_A), [0x12, 0x34])
+        self.assertEqual((record.ERG_KEY1BYTE0.BIT_A, record.ERG_KEY1BYTE0.BIT_B, record.ERG_KEY1BYTE0.BIT_C),
+                         (5, 1, 5))
+        # Structures share memory with image
+        record.ITEM_A[1] = 0x35
+        self.assertEqual(image[9], 0x35)
+        self.assertEqual(records[2][1].tobytes(), '\x78')
+        # Same record decoded by the registry of the other excel
+        record = list(self.module['records'](image, 'other.xlsx', header_size=4))[0][1]
+        self.assertEqual([field[0] for field in record._fields_], ['ITEM_B'])
+        self.assertEqual(list(record.ITEM_B), [0x12, 0x35, 0xb5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 12:20:41 AM CET
+# File Name: test_delta.py
+# Description:
+#########################################################################
+
+import os
+import unittest
+from exlparser.delta import make_delta, apply_delta, read_delta
+from exlparser.writer import BinWriter
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'output')
+
+def image(records, header='\x00\x00\x12\x34', checksum='sum16', indexed=False):
+    """Binary file content of header value and list of (key, value)."""
+    frags = [['\x00\x00', '\x00\x00', header]]
+    frags += [['\x07' + chr(key), '\x00' + chr(len(value) * 8), value] for key, value in records]
+    writer = BinWriter(checksum)
+    writer.write_fragments(frags)
+    if indexed:
+        writer.write_directory()
+    writer.fill_checksum()
+    return str(writer.buffer)
+
+class TestDelta(unittest.TestCase):
+
+    def setUp(self):
+        self.old = [(1, 'AB'), (2, 'CDE'), (3, 'F'), (4, 'GH'), (5, 'IJ')]
+
+    def check(self, new_records, **kwargs):
+        old = image(self.old, **kwargs)
+        new = image(new_records, header='\x00\x00\x56\x78', **kwargs)
+        patch = make_delta(old, new, kwargs.get('checksum', 'sum16'), 4, kwargs.get('indexed', False))
+        self.assertEqual(apply_delta(old, patch), new)
+        return read_delta(patch)[-1]
+
+    def test_unchanged(self):
+        self.assertEqual(self.check(self.old), [])
+
+    def test_update(self):
+        ops = self.check([(1, 'AB'), (2, 'XYZ'), (3, 'F'), (4, 'GHIJ'), (5, 'IJ')])
+        self.assertEqual([(op[0], op[1]) for op in ops], [('U', 0x0702), ('U', 0x0704)])
+
+    def test_insert_delete_move(self):
+        new = [(9, 'Z'), (1, 'AB'), (6, 'K'), (7, 'LM'), (3, 'F'), (5, 'IJ'), (2, 'CDE')]
+        ops = self.check(new)
+        self.assertEqual([(op[0], op[1], op[2]) for op in ops],
+                         [('D', 0x0702, None), ('D', 0x0704, None), ('F', 0x0709, None), ('I', 0x0706, 0x0701),
+                          ('I', 0x0707, 0x0706), ('I', 0x0702, 0x0705)])
+        self.check([], checksum='crc16-ccitt')
+        self.check(new, indexed=True)
+
+    def test_wrong_base(self):
+        patch = make_delta(image(self.old), image(self.old[1:]), header_size=4)
+        self.assertRaises(ValueError, apply_delta, image(self.old, header='\x00\x00\x00\x00'), patch)
+
+    def test_output(self):
+        with open(os.path.join(OUTPUT_DIR, 'bt.bin'), 'rb') as f:
+            old = f.read()
+        with open(os.path.join(OUTPUT_DIR, 'test.bin'), 'rb') as f:
+            new = f.read()
+        self.assertEqual(apply_delta(old, make_delta(old, new)), new)
+        self.assertEqual(len(make_delta(new, new)), 4 + 1 + 1 + 5 + 2 + 2 + 14 + 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
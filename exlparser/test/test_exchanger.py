@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 11:20:45 AM CET
+# File Name: test_exchanger.py
+# Description:
+#########################################################################
+
+import os
+import unittest
+from cStringIO import StringIO
+import xlrd
+from exlparser.exchanger import convert_workbook, split_sheet, open_sheet, parse_sheet, gen_header
+from exlparser.keymap import parse_key_names
+from exlparser.benchmark import SyntheticSheet, HEADER_ROWS, KEY_ROWS
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+INPUT_DIR = os.path.join(ROOT_DIR, 'input')
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'output')
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+class TestExchanger(unittest.TestCase):
+
+    def setUp(self):
+        self.header = read(os.path.join(OUTPUT_DIR, 'header.h'))
+
+    def test_convert_workbook_content(self):
+        for excel, binary in [('bt.xls', 'bt.bin'), ('test_odd.xlsx', 'test_odd.bin')]:
+            bin_content, header_content = convert_workbook(read(os.path.join(INPUT_DIR, excel)))
+            self.assertEqual(bin_content, read(os.path.join(OUTPUT_DIR, binary)))
+            self.assertTrue(header_content in self.header)
+
+    def test_convert_workbook_path(self):
+        bin_content, header_content = convert_workbook(os.path.join(INPUT_DIR, 'test.xlsx'))
+        self.assertEqual(bin_content, read(os.path.join(OUTPUT_DIR, 'test.bin')))
+        self.assertTrue(header_content in self.header)
+        # Unicode path, and content in a bytearray
+        self.assertEqual(convert_workbook(os.path.join(INPUT_DIR, 'bt.xls').decode('utf-8'))[0],
+                         read(os.path.join(OUTPUT_DIR, 'bt.bin')))
+        self.assertEqual(convert_workbook(bytearray(read(os.path.join(INPUT_DIR, 'bt.xls'))))[0],
+                         read(os.path.join(OUTPUT_DIR, 'bt.bin')))
+        # Content given explicitly is never taken for a path
+        self.assertEqual(convert_workbook('bt.xls', file_contents=read(os.path.join(INPUT_DIR, 'bt.xls')))[0],
+                         read(os.path.join(OUTPUT_DIR, 'bt.bin')))
+        self.assertRaises(xlrd.XLRDError, convert_workbook, 'bad.xlsx', file_contents='not an excel')
+
+    def test_gen_header_sink(self):
+        # One sink shared by all excels gets the whole header
+        sink = StringIO()
+        for excel in ['bt.xls', 'test.xlsx', 'test_odd.xlsx']:
+            book, sheet = open_sheet(os.path.join(INPUT_DIR, excel))
+            entries = parse_sheet(sheet).entries
+            self.assertEqual(gen_header(entries, sink), None)
+        self.assertEqual(sink.getvalue(), self.header)
+        sink = StringIO()
+        for excel in ['bt.xls', 'test.xlsx', 'test_odd.xlsx']:
+            self.assertEqual(convert_workbook(os.path.join(INPUT_DIR, excel), header_sink=sink)[1], None)
+        self.assertEqual(sink.getvalue(), self.header)
+        self.assertTrue(gen_header(entries) in self.header)
+
+    def test_split_sheet(self):
+        sheet = SyntheticSheet(len(HEADER_ROWS) + 3 * len(KEY_ROWS))
+        first_key = 2 + len(HEADER_ROWS)
+        self.assertEqual(split_sheet(sheet, 1), [(2, first_key), (first_key, first_key + len(KEY_ROWS)),
+                                                 (first_key + len(KEY_ROWS), first_key + 2 * len(KEY_ROWS)),
+                                                 (first_key + 2 * len(KEY_ROWS), sheet.nrows - 1)])
+        self.assertEqual(split_sheet(sheet, sheet.nrows), [(2, sheet.nrows - 1)])
+
+    def test_convert_workbook_extras(self):
+        result = convert_workbook(read(os.path.join(INPUT_DIR, 'bt.xls')), extras=True)
+        names = parse_key_names(result[2])
+        self.assertEqual(names[0], (0x0C01, 'ERG_SGM358_BT_KEY1'))
+        self.assertEqual(len(names), 14)
+        chunk_result = convert_workbook(read(os.path.join(INPUT_DIR, 'bt.xls')), jobs=2, chunk_rows=5,
+                                        extras=True)
+        self.assertEqual(chunk_result, result)
+
+    def test_convert_workbook_chunks(self):
+        for excel, binary in [('bt.xls', 'bt.bin'), ('test.xlsx', 'test.bin')]:
+            bin_content, header_content = convert_workbook(read(os.path.join(INPUT_DIR, excel)), jobs=2,
+                                                           chunk_rows=5)
+            self.assertEqual(bin_content, read(os.path.join(OUTPUT_DIR, binary)))
+            self.assertTrue(header_content in self.header)
+
+    def test_open_sheet(self):
+        for excel in ['bt.xls', 'test.xlsx']:
+            book, sheet = open_sheet(read(os.path.join(INPUT_DIR, excel)), u'Sheet1')
+            self.assertEqual(sheet.number, 0)
+            self.assertEqual([book.sheet_loaded(index) for index in range(book.nsheets)], [True, False, False])
+            book.unload_sheet(sheet.number)
+            self.assertFalse(book.sheet_loaded(0))
+        self.assertRaises(xlrd.XLRDError, open_sheet, os.path.join(INPUT_DIR, 'bt.xls'), 'Calibration')
+
+    def test_convert_workbook_sheet(self):
+        bin_content, header_content = convert_workbook(read(os.path.join(INPUT_DIR, 'bt.xls')), sheet=u'Sheet1')
+        self.assertEqual(bin_content, read(os.path.join(OUTPUT_DIR, 'bt.bin')))
+
+
+if __name__ == "__main__":
+    unittest.main()
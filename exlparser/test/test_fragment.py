@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 07:40:52 PM CET
+# File Name: test_fragment.py
+# Description:
+#########################################################################
+
+import unittest
+from exlparser.fragment import FragmentTable
+from exlparser.writer import BinWriter
+
+class TestFragment(unittest.TestCase):
+
+    def setUp(self):
+        self.frags = [['\x07\x00', '\x00\x10', '\x00\x00'], ['\x07\x00', '\x00\x20', '\x12\x34\x56\x78'],
+                      ['\x07\x01', '\x00\x08', '\x11'],
+                      ['\x07\x01', '\x00\x04', '\x0a'], ['\x07\x01', '\x00\x04', '\x05'],
+                      ['\x07\x02', '\x00\x18', 'AB\x00']]
+
+    def test_table(self):
+        table = FragmentTable.from_fragments(self.frags)
+        self.assertEqual(len(table), 6)
+        self.assertEqual(list(table.keys), [0x0700, 0x0700, 0x0701, 0x0701, 0x0701, 0x0702])
+        self.assertEqual(list(table.lengths), [16, 32, 8, 4, 4, 24])
+        self.assertEqual(table.value(1).tobytes(), '\x12\x34\x56\x78')
+        self.assertEqual(table.to_fragments(), self.frags)
+
+    def test_merge(self):
+        merged = FragmentTable.from_fragments(self.frags).merge()
+        self.assertEqual(merged.to_fragments(), [['\x07\x00', '\x00\x30', '\x00\x00\x12\x34\x56\x78'],
+                                                 ['\x07\x01', '\x00\x10', '\x11\xa5'],
+                                                 ['\x07\x02', '\x00\x18', 'AB\x00']])
+
+    def test_write_table(self):
+        merged = FragmentTable.from_fragments(self.frags).merge()
+        table_writer = BinWriter()
+        table_writer.write_table(merged)
+        fragments_writer = BinWriter()
+        fragments_writer.write_fragments(merged.to_fragments())
+        self.assertEqual(table_writer.buffer, fragments_writer.buffer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 04:40:17 AM CET
+# File Name: test_incremental.py
+# Description:
+#########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+from exlparser.exchanger import parse_sheet, gen_binary, convert_sheet_incremental, convert_workbook
+from exlparser.incremental import scan_groups, load_index, save_index
+from exlparser.test.test_validation import ListSheet
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+INPUT_DIR = os.path.join(ROOT_DIR, 'input')
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'output')
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [[0, 16, 0, u'CHECKSUM', None],
+                     [0, 8, 3, u'VERSION', None],
+                     [701, 8, 28, u'ITEM_8', u'ERG_KEY1'],
+                     [701, 4, u'A', u'BIT_4', u'ERG_KEY1'],
+                     [701, 4, 1, u'BIT_4B', u'ERG_KEY1'],
+                     [u'0702', 24, u'"AB"', u'STRING', u'ERG_KEY2'],
+                     [u'0703', 16, 1234, u'WORD', u'ERG_KEY3']]
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def full(self, rows, checksum='sum16', indexed=False):
+        sheet = ListSheet(rows)
+        model = parse_sheet(sheet)
+        return gen_binary(model.fragments, checksum=checksum, indexed=indexed), model.entries
+
+    def test_scan_groups(self):
+        groups = scan_groups(ListSheet(self.rows))
+        self.assertEqual([(key, start, end) for key, digest, start, end in groups],
+                         [(0x0000, 2, 4), (0x0701, 4, 7), (0x0702, 7, 8), (0x0703, 8, 9)])
+        self.rows.append([701, 8, 0, u'AGAIN', u'ERG_KEY1'])
+        self.assertRaises(ValueError, scan_groups, ListSheet(self.rows))
+
+    def test_convert(self):
+        for checksum in ['sum16', 'crc16-ccitt']:
+            for indexed in [False, True]:
+                bin_content, entries, keys, groups = convert_sheet_incremental(ListSheet(self.rows), {},
+                                                                               checksum=checksum, indexed=indexed)
+                self.assertEqual((bin_content, entries), self.full(self.rows, checksum, indexed))
+                old_groups = dict((group.key, group) for group in groups)
+
+                # Change a bit field of ERG_KEY1 and the length of ERG_KEY2
+                rows = [list(row) for row in self.rows]
+                rows[3][2] = u'5'
+                rows[5][1:3] = [32, u'"ABC"']
+                bin_content, entries, keys, new_groups = convert_sheet_incremental(ListSheet(rows), old_groups,
+                                                                                   checksum=checksum,
+                                                                                   indexed=indexed)
+                self.assertEqual((bin_content, entries), self.full(rows, checksum, indexed))
+                self.assertEqual(keys, [0, 0, 0x0701, 0x0701, 0x0701, 0x0702, 0x0703])
+                # Unchanged groups are reused
+                self.assertEqual([new is old for new, old in zip(new_groups, groups)], [True, False, False, True])
+
+    def test_index(self):
+        groups = convert_sheet_incremental(ListSheet(self.rows), {})[3]
+        path = os.path.join(self.tmp_dir, 'index', 'test.xlsx.idx')
+        save_index(path, '1.3:sum16:0', groups)
+        self.assertEqual(load_index(path, '1.3:sum16:0'), dict((group.key, group) for group in groups))
+        self.assertEqual(load_index(path, '1.3:crc32:0'), {})
+        with open(path, 'wb') as f:
+            f.write('broken')
+        self.assertEqual(load_index(path, '1.3:sum16:0'), {})
+
+    def test_convert_workbook(self):
+        index_file = os.path.join(self.tmp_dir, 'test.xlsx.idx')
+        for excel, binary in [('test.xlsx', 'test.bin'), ('test_odd.xlsx', 'test_odd.bin'),
+                              ('test.xlsx', 'test.bin')]:
+            bin_content, header_content = convert_workbook(os.path.join(INPUT_DIR, excel), index_file=index_file)
+            self.assertEqual(bin_content, read(os.path.join(OUTPUT_DIR, binary)))
+            self.assertTrue(header_content in read(os.path.join(OUTPUT_DIR, 'header.h')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 01:16:29 AM CET
+# File Name: test_keymap.py
+# Description:
+#########################################################################
+
+import unittest
+from exlparser.keymap import collect_key_names, format_key_names, parse_key_names, merge_key_names, \
+    gen_key_name_map
+
+class TestKeymap(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = [0x0700, 0x0700, 0x0701, 0x0701, 0x0702, 0x0703]
+        self.entries = [['CHECKSUM', 16, ''], ['MODULE_ID', 16, ''],
+                        ['ITEM_A', 8, 'ERG_KEY1'], ['ITEM_B', 8, 'ERG_KEY1'],
+                        ['ITEM_C', 16, 'ERG_KEY2'], ['ITEM_D', 8, '']]
+
+    def test_collect(self):
+        pairs = collect_key_names(self.keys, self.entries)
+        self.assertEqual(pairs, [(0x0701, 'ERG_KEY1'), (0x0702, 'ERG_KEY2')])
+        self.assertEqual(parse_key_names(format_key_names(pairs)), pairs)
+
+    def test_merge(self):
+        merged = merge_key_names([[(0x0C02, 'ERG_BT2'), (0x0C01, 'ERG_BT1')],
+                                  [(0x0701, 'ERG_KEY1'), (0x0C01, 'ERG_BT1')],
+                                  [(0x0701, 'ERG_OTHER')]])
+        self.assertEqual(merged, [(0x0701, 'ERG_KEY1'), (0x0C01, 'ERG_BT1'), (0x0C02, 'ERG_BT2')])
+
+    def test_gen(self):
+        content = gen_key_name_map([(0x0701, 'ERG_KEY1'), (0x0C02, 'ERG_BT2')])
+        self.assertTrue("#define KEYID2KEYNAME_TABLE_SIZE 2\n" in content)
+        self.assertTrue('\t{{0x07, 0x01}, "ERG_KEY1"},\n\t{{0x0C, 0x02}, "ERG_BT2"},\n};\n' in content)
+        self.assertTrue("diagKeyid2KeyName_lookup(unsigned short key_id)" in content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 11:24:37 PM CET
+# File Name: test_reader.py
+# Description:
+#########################################################################
+
+import os
+import unittest
+import xlrd
+from exlparser.reader import BinReader, Record, layout_of, verify_files
+from exlparser.writer import BinWriter
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+INPUT_DIR = os.path.join(ROOT_DIR, 'input')
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'output')
+
+class TestReader(unittest.TestCase):
+
+    def setUp(self):
+        self.frags = [['\x00\x00', '\x00\x20', '\x00\x00\x12\x34'],
+                      ['\x07\x01', '\x00\x10', '\x11\xa5'],
+                      ['\x07\x02', '\x00\x18', 'AB\x00']]
+
+    def write(self, checksum='sum16'):
+        writer = BinWriter(checksum)
+        writer.write_fragments(self.frags)
+        writer.fill_checksum()
+        return writer.buffer
+
+    def test_records(self):
+        reader = BinReader(self.write(), header_size=4)
+        self.assertEqual(reader.header.tobytes()[2:], '\x12\x34')
+        records = list(reader.records())
+        self.assertEqual([(r.key, r.length, r.value.tobytes()) for r in records],
+                         [(0x0701, 16, '\x11\xa5'), (0x0702, 24, 'AB\x00')])
+        self.assertTrue(isinstance(records[0], Record))
+
+    def test_verify(self):
+        for checksum in ['sum16', 'crc16-ccitt', 'crc32']:
+            self.frags[0][1:] = ['\x00\x40', '\x00' * 8] if checksum == 'crc32' else ['\x00\x20', '\x00\x00\x12\x34']
+            data = self.write(checksum)
+            header_size = len(self.frags[0][2])
+            self.assertEqual(BinReader(data, header_size).verify(checksum), [])
+            data[-1] ^= 1
+            self.assertEqual(len(BinReader(data, header_size).verify(checksum)), 1)
+        self.setUp()
+        data = self.write()
+        self.assertEqual(BinReader(data, 4).verify(layout={0x0701: 16, 0x0702: 24}), [])
+        self.assertEqual(BinReader(data, 4).verify(layout={0x0701: 8, 0x0703: 8}),
+                         ["Bit-length of Key ID 0701 is 16, not 8", "Key ID 0702 is not in layout",
+                          "Key ID 0703 is missing"])
+        problems = BinReader(data[:-1], 4).verify()
+        self.assertEqual(problems[-1], "Value of Key ID 0702 at offset 14 is truncated")
+
+    def test_directory(self):
+        writer = BinWriter()
+        writer.write_fragments([self.frags[0], self.frags[2], self.frags[1]])
+        self.assertEqual(writer.write_directory(), 2)
+        writer.fill_checksum()
+        data = writer.buffer
+        # Records end at 17, directory starts at 20
+        self.assertEqual(len(data), 20 + 2 * 8 + 12)
+        reader = BinReader(data, 4, indexed=True)
+        self.assertEqual(reader.directory(), [(0x0701, 15, 2), (0x0702, 8, 3)])
+        self.assertEqual([r.key for r in reader.records()], [0x0702, 0x0701])
+        self.assertEqual(reader.find(0x0701).value.tobytes(), '\x11\xa5')
+        self.assertEqual(reader.find(0x0702).length, 24)
+        self.assertEqual(reader.find(0x0703), None)
+        self.assertEqual(reader.verify(), [])
+        self.assertRaises(ValueError, BinReader, data[:-1], 4, True)
+        self.assertRaises(ValueError, BinReader(data, 4).find, 0x0701)
+
+    def test_verify_output(self):
+        bin_files = [os.path.join(OUTPUT_DIR, name) for name in ['bt.bin', 'test.bin', 'test_odd.bin']]
+        excel_files = [os.path.join(INPUT_DIR, name) for name in ['bt.xls', 'test.xlsx', 'test_odd.xlsx']]
+        results = verify_files(bin_files, excel_files=excel_files, jobs=2)
+        self.assertEqual(results.keys(), bin_files)
+        self.assertEqual(results.values(), [[], [], []])
+        self.assertTrue(layout_of(excel_files[0]))
+        # Calibration sheet by name
+        self.assertEqual(verify_files(bin_files, excel_files=excel_files, sheet=u'Sheet1').values(), [[], [], []])
+        self.assertRaises(xlrd.XLRDError, verify_files, bin_files, excel_files=excel_files, sheet=u'Calibration')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 06:21:09 PM CET
+# File Name: test_scale.py
+# Description:
+#########################################################################
+
+import unittest
+from exlparser.scale import encode_fixed, dec_int_to_binary_real, int_repr_to_binary_real, binary_real_to_dec_int
+
+class TestScale(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_encode_fixed(self):
+        self.assertEqual(encode_fixed(0, 16), '\x00\x00')
+        self.assertEqual(encode_fixed(0xFF, 8), '\xff')
+        self.assertEqual(encode_fixed(0x12345678, 32), '\x12\x34\x56\x78')
+        self.assertEqual(encode_fixed(0x1234, 40), '\x00\x00\x00\x12\x34')
+        self.assertEqual(encode_fixed(1, 128), '\x00' * 15 + '\x01')
+
+    def test_dec_int_to_binary_real(self):
+        self.assertEqual(dec_int_to_binary_real(0, 8), '\x00')
+        self.assertEqual(dec_int_to_binary_real(0x0C01, 16), '\x0c\x01')
+        self.assertEqual(dec_int_to_binary_real(1, 1), '\x01')
+        self.assertEqual(dec_int_to_binary_real(0x1E, 4 * 8), '\x00\x00\x00\x1e')
+        self.assertRaises(ValueError, dec_int_to_binary_real, 0x100, 8)
+        self.assertRaises(TypeError, dec_int_to_binary_real, 1.0, 8)
+
+    def test_int_repr_to_binary_real(self):
+        self.assertEqual(int_repr_to_binary_real(0, 16), '\x00\x00')
+        self.assertEqual(int_repr_to_binary_real(12345678, 32), '\x12\x34\x56\x78')
+        self.assertEqual(int_repr_to_binary_real(1, 1), '\x01')
+        # Digits wider than the length, kept as the generic path converts them
+        self.assertEqual(int_repr_to_binary_real(10000, 16), '\x01\x00\x00')
+        self.assertRaises(ValueError, int_repr_to_binary_real, 2, 1)
+
+    def test_binary_real_to_dec_int(self):
+        self.assertEqual(binary_real_to_dec_int('\x7f'), 0x7f)
+        self.assertEqual(binary_real_to_dec_int('\x01\x02\x03'), 0x010203)
+        self.assertEqual(binary_real_to_dec_int('\xff' * 8), 2**64 - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,7 @@
 #########################################################################
 
 import unittest
+from cStringIO import StringIO
 from exlparser.utility import merge_fragment, merge_bit_pool, checksum, gen_bf_structure
 
 class TestExchanger(unittest.TestCase):
@@ -27,6 +28,23 @@ class TestExchanger(unittest.TestCase):
         merge_fragment(frags)
         self.assertEqual(frags,[['\x00\x01', '\x00\x28', '\x7f\xAA\x7f'],['\x00\x02','\x00\x10','\x7f']])
 
+    def test_merge_fragment_not_contiguous(self):
+        frags = [['\x00\x01','\x00\x08','\x7f'],
+                 ['\x00\x02','\x00\x08','\x7f'],
+                 ['\x00\x01','\x00\x08','\x7f']]
+        self.assertRaises(ValueError, merge_fragment, frags)
+
+    def test_merge_fragment_bit_fields(self):
+        frags = [['\x00\x01','\x00\x03','\x05'],['\x00\x01','\x00\x05','\x11'],
+                 ['\x00\x01','\x00\x08','\x7f'],
+                 ['\x00\x01','\x00\x02','\x02'],['\x00\x01','\x00\x02','\x01'],['\x00\x01','\x00\x04','\x0c']]
+        merge_fragment(frags)
+        self.assertEqual(frags,[['\x00\x01', '\x00\x18', '\xb1\x7f\x9c']])
+
+    def test_merge_fragment_bit_fields_not_aligned(self):
+        frags = [['\x00\x01','\x00\x03','\x05'],['\x00\x01','\x00\x08','\x7f']]
+        self.assertRaises(ValueError, merge_fragment, frags)
+
     def test_merge_bit_pool(self):
         bit_pool = ['\x01', '\x00', '\x01', '\x01', '\x00', '\x00', '\x00', '\x01',
                     '\x01', '\x01', '\x01', '\x01', '\x00', '\x00', '\x00', '\x00']
@@ -46,6 +64,9 @@ class TestExchanger(unittest.TestCase):
                 ["Bit_0", 1.0, "myKeyName"]]
         byte_counter = 5
         self.assertEqual(gen_bf_structure(pool, 5), '\tstruct s_myKeyNameBYTE5\n\t{\n\t\tchar Bit_7: 1;\n\t\tchar Bit_6: 1;\n\t\tchar Bit_5: 1;\n\t\tchar Bit_4: 1;\n\t\tchar Bit_3: 1;\n\t\tchar Bit_2: 1;\n\t\tchar Bit_1: 1;\n\t\tchar Bit_0: 1;\n\t} myKeyNameBYTE5;\n\n')
+        sink = StringIO()
+        gen_bf_structure(pool, 5, sink)
+        self.assertEqual(sink.getvalue(), gen_bf_structure(pool, 5))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 10:31:08 PM CET
+# File Name: test_validation.py
+# Description:
+#########################################################################
+
+import unittest
+import xlrd
+from xlrd.sheet import Cell
+from exlparser.codec import COLUMNS
+from exlparser.validation import ValidationError, validate_sheet
+
+EMPTY = Cell(xlrd.XL_CELL_EMPTY, '')
+
+def cell(value):
+    if value is None:
+        return EMPTY
+    if isinstance(value, unicode):
+        return Cell(xlrd.XL_CELL_TEXT, value)
+    if isinstance(value, bool):
+        return Cell(xlrd.XL_CELL_BOOLEAN, int(value))
+    return Cell(xlrd.XL_CELL_NUMBER, float(value))
+
+class ListSheet(object):
+    """Sheet of rows of [Key ID, Item length, value, Calibration Name, Key Name], between title and end row."""
+
+    def __init__(self, rows):
+        self.rows = [[EMPTY] * len(COLUMNS)] + [[cell(unicode(column)) for column in COLUMNS]]
+        self.rows += [[cell(value) for value in row] for row in rows] + [[EMPTY] * len(COLUMNS)]
+
+    def row_values(self, rowx):
+        return [c.value for c in self.rows[rowx]]
+
+    def row(self, rowx):
+        return self.rows[rowx]
+
+    def col(self, colx):
+        return [row[colx] for row in self.rows]
+
+    def col_values(self, colx, start_rowx=0, end_rowx=None):
+        return [row[colx].value for row in self.rows[start_rowx:end_rowx]]
+
+    def col_types(self, colx, start_rowx=0, end_rowx=None):
+        return [row[colx].ctype for row in self.rows[start_rowx:end_rowx]]
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [[0, 16, 0, u'CHECKSUM', None],
+                     [701, 8, 28, u'ITEM_8', u'ERG_KEY1'],
+                     [701, 4, u'A', u'BIT_4', u'ERG_KEY1'],
+                     [701, 4, 1, u'BIT_4B', u'ERG_KEY1'],
+                     [u'0702', 32, u'"AB"', u'STRING', u'ERG_KEY2']]
+
+    def test_valid(self):
+        self.assertEqual(validate_sheet(ListSheet(self.rows)), [])
+
+    def test_all_violations(self):
+        rows = self.rows + [[u'0703', True, 1, u'BOOL', u'ERG_KEY3'],
+                            [u'0703', 16, 10000, u'WIDE', u'ERG_KEY3'],
+                            [u'0703', 16, u'XY', u'NOT_HEX', 1],
+                            [u'0703', 3, 1, u'BIT_3', u'ERG_KEY3'],
+                            [u'0703', 12, u'"A"', u'BIT_12', u'ERG_KEY3'],
+                            [u'Z', 8, 0, u'BAD_KEY', u'ERG_KEY3'],
+                            [701, 8, 0, u'AGAIN', u'ERG_KEY1'],
+                            [701, 2, 0, u'BIT_2', u'ERG_KEY1']]
+        violations = validate_sheet(ListSheet(rows))
+        self.assertEqual([(v['row'], v['column'], v['rule']) for v in violations],
+                         [(8, 'Item length', 'type'),
+                          (9, 'Factory Default (N-Value) Hex', 'width'),
+                          (10, 'Factory Default (N-Value) Hex', 'value'),
+                          (10, 'Key Name', 'type'),
+                          (12, 'Item length', 'bit_group'),
+                          (12, 'Factory Default (N-Value) Hex', 'length'),
+                          (13, 'Key ID', 'key'),
+                          (14, 'Key ID', 'key_order'),
+                          (15, 'Item length', 'bit_group')])
+        self.assertTrue(str(ValidationError(violations)).startswith("9 violation(s), 1st at row 8"))
+
+    def test_checksum_size(self):
+        self.assertEqual(validate_sheet(ListSheet(self.rows), 2), [])
+        violations = validate_sheet(ListSheet(self.rows), 4)
+        self.assertEqual([(v['row'], v['column'], v['rule']) for v in violations], [(3, 'Item length', 'checksum')])
+
+    def test_key_name_change(self):
+        rows = self.rows + [[703, 4, 1, u'BIT_A', u'ERG_KEY3'],
+                            [703, 4, 1, u'BIT_B', u'ERG_KEY4']]
+        violations = validate_sheet(ListSheet(rows))
+        self.assertEqual([(v['row'], v['column'], v['rule']) for v in violations],
+                         [(8, 'Item length', 'bit_group'), (9, 'Item length', 'bit_group')])
+
+
+if __name__ == "__main__":
+    unittest.main()
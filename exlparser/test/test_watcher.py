@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 03:31:08 AM CET
+# File Name: test_watcher.py
+# Description:
+#########################################################################
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from exlparser.exchanger import convert_excel_checked, HEADER_FILE_NAME, VALIDATION_FILE_NAME
+from exlparser.watcher import Watcher, request
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+INPUT_DIR = os.path.join(ROOT_DIR, 'input')
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'output')
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+class TestWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.tmp_dir, 'input')
+        self.output_dir = os.path.join(self.tmp_dir, 'output')
+        os.mkdir(self.input_dir)
+        os.mkdir(self.output_dir)
+        for excel in ['bt.xls', 'test.xlsx']:
+            shutil.copy(os.path.join(INPUT_DIR, excel), self.input_dir)
+        self.watcher = Watcher(self.input_dir, self.output_dir, convert_excel_checked)
+
+    def tearDown(self):
+        self.watcher.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_refresh(self):
+        summary = self.watcher.refresh()
+        self.assertEqual(summary['converted'], ['bt.xls', 'test.xlsx'])
+        self.assertEqual(read(os.path.join(self.output_dir, 'bt.bin')), read(os.path.join(OUTPUT_DIR, 'bt.bin')))
+        self.assertTrue(read(os.path.join(OUTPUT_DIR, HEADER_FILE_NAME)).startswith(
+            read(os.path.join(self.output_dir, HEADER_FILE_NAME))))
+        # Nothing changed, the last conversion is kept for status
+        self.assertEqual(self.watcher.refresh()['converted'], [])
+        self.assertEqual(self.watcher.last['converted'], ['bt.xls', 'test.xlsx'])
+
+        shutil.copy(os.path.join(INPUT_DIR, 'test_odd.xlsx'), os.path.join(self.input_dir, 'test.xlsx'))
+        os.utime(os.path.join(self.input_dir, 'test.xlsx'), (time.time() + 10, time.time() + 10))
+        os.remove(os.path.join(self.input_dir, 'bt.xls'))
+        summary = self.watcher.refresh()
+        self.assertEqual((summary['converted'], summary['removed']), (['test.xlsx'], ['bt.xls']))
+        self.assertEqual(read(os.path.join(self.output_dir, 'test.bin')),
+                         read(os.path.join(OUTPUT_DIR, 'test_odd.bin')))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'bt.bin')))
+
+    def test_failed_and_invalid(self):
+        with open(os.path.join(self.input_dir, 'broken.xlsx'), 'wb') as f:
+            f.write('not an excel')
+        summary = self.watcher.refresh()
+        self.assertEqual(summary['failed'].keys(), ['broken.xlsx'])
+        self.assertTrue(summary['failed']['broken.xlsx'].startswith('XLRDError'))
+        self.assertEqual(summary['invalid'], [])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, VALIDATION_FILE_NAME)))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'test.bin')))
+
+        # Binary of an excel which fails is removed with its header
+        with open(os.path.join(self.input_dir, 'test.xlsx'), 'wb') as f:
+            f.write('not an excel either')
+        os.utime(os.path.join(self.input_dir, 'test.xlsx'), (time.time() + 10, time.time() + 10))
+        summary = self.watcher.refresh()
+        self.assertEqual(sorted(summary['failed']), ['broken.xlsx', 'test.xlsx'])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'test.bin')))
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'bt.bin')))
+
+    def test_serve(self):
+        socket_path = os.path.join(self.tmp_dir, 'exchanger.sock')
+        thread = threading.Thread(target=self.watcher.serve, args=(socket_path, 60))
+        thread.start()
+        try:
+            for i in range(100):
+                if os.path.exists(socket_path):
+                    break
+                time.sleep(0.05)
+            self.assertEqual(request(socket_path, 'status', 10)['converted'], ['bt.xls', 'test.xlsx'])
+            self.assertEqual(request(socket_path, 'convert', 10)['converted'], [])
+            self.assertEqual(request(socket_path, 'status', 10)['converted'], ['bt.xls', 'test.xlsx'])
+            self.assertTrue('error' in request(socket_path, 'rebuild', 10))
+        finally:
+            request(socket_path, 'stop', 10)
+            thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(socket_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#########################################################################
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 02:10:37 PM CET
+# File Name: test_writer.py
+# Description:
+#########################################################################
+
+import random
+import unittest
+from exlparser.utility import checksum
+from exlparser.writer import BinWriter
+from exlparser.checksums import sum16, CHUNK, Sum16, new_checksum
+
+class TestWriter(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_sum16(self):
+        rand = random.Random(0)
+        values = ''.join([chr(rand.randint(0, 255)) for i in range(CHUNK.size * 2 + 5)])
+        pairs = [values[i:i+2] for i in range(0, len(values) - 1, 2)] + [values[-1] + '\x00']
+        self.assertEqual(sum16(memoryview(bytearray('ab' + values)), 2) % 2**16,
+                         (2**16 - int(checksum(pairs).encode('hex'), 16)) % 2**16)
+
+    def test_sum16_accumulator(self):
+        rand = random.Random(1)
+        values = ''.join([chr(rand.randint(0, 255)) for i in range(CHUNK.size * 3 + 7)])
+        expected = -sum16(bytearray(values)) & 0xFFFF
+        # Fed in chunks with odd lengths
+        acc = Sum16()
+        for start, end in [(0, 1), (1, 4), (4, 4), (4, 9000), (9000, len(values))]:
+            acc.update(values[start:end])
+        self.assertEqual(acc.count, len(values))
+        self.assertEqual(acc.digest(), expected)
+        # Combined from independent chunks
+        chunks = []
+        for start, end in [(0, 3), (3, 10), (10, 8193), (8193, len(values))]:
+            chunk = Sum16()
+            chunk.update(values[start:end])
+            chunks.append(chunk)
+        acc = reduce(Sum16.combine, chunks[1:], chunks[0])
+        self.assertEqual(acc.digest(), expected)
+
+    def test_crc(self):
+        for name, expected in [('crc16-ccitt', 0x29b1), ('crc32', 0xcbf43926)]:
+            acc = new_checksum(name)
+            acc.update('1234')
+            acc.update(memoryview(bytearray('x56789'))[1:])
+            self.assertEqual(acc.digest(), expected)
+        self.assertRaises(KeyError, new_checksum, 'md5')
+
+    def test_write_fragments(self):
+        frags = [['\x07\x00', '\x00\x60', '\x00\x00\x00\x07\x00\x22\x12\x34\x56\x78\x41\x41\x00\x00'],
+                 ['\x07\x01', '\x00\x08', '\x11'],
+                 ['\x07\x02', '\x00\x10', '\x12\x34']]
+        writer = BinWriter()
+        writer.write_fragments(frags)
+        self.assertEqual(writer.fill_checksum(), 0xf7c8)
+        self.assertEqual(str(writer.buffer), '\xf7\xc8\x00\x07\x00\x22\x12\x34\x56\x78\x41\x41\x00\x00'
+                                             '\x07\x01\x00\x08\x11\x07\x02\x00\x10\x12\x34')
+
+
+    def test_restore(self):
+        header = ['\x07\x00', '\x00\x60', '\x00\x00\x00\x07\x00\x22\x12\x34\x56\x78\x41\x41\x00\x00']
+        records = [['\x07\x01', '\x00\x08', '\x11'], ['\x07\x02', '\x00\x10', '\x12\x34']]
+        for name in ['sum16', 'crc16-ccitt']:
+            expected = BinWriter(name)
+            expected.write_fragments([header] + records)
+            expected.fill_checksum()
+            # Header and records written separately, then restored from content and Sum16 state
+            header_writer = BinWriter(name)
+            header_writer.write_fragments([header])
+            records_writer = BinWriter(name, header=False)
+            records_writer.write_fragments(records)
+            writers = []
+            for chunk, is_header in [(header_writer, True), (records_writer, False)]:
+                state = chunk.checksum.state() if isinstance(chunk.checksum, Sum16) else None
+                writers.append(BinWriter.restore(name, str(chunk.buffer), is_header, state))
+            writers[0].extend(writers[1])
+            self.assertEqual(writers[0].header_size, 14)
+            writers[0].fill_checksum()
+            self.assertEqual(writers[0].buffer, expected.buffer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 03:05:19 PM CET
+
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+class Profiler(object):
+    """Record wall time and number of calls of each stage, and counters of a conversion."""
+
+    def __init__(self):
+        self.stages = OrderedDict()
+        self.counters = OrderedDict()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of stage.
+
+        :param name: Stage name.
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            record = self.stages.setdefault(name, OrderedDict([('time', 0.0), ('calls', 0)]))
+            record['time'] += time.time() - start
+            record['calls'] += 1
+
+    def count(self, name, num=1):
+        """Increase counter.
+
+        :param name: Counter name.
+        :param num: Increment.
+        :return: None
+        """
+        self.counters[name] = self.counters.get(name, 0) + num
+        return None
+
+    def report(self):
+        """
+        :return: Dict of stages and counters, serializable to JSON.
+        """
+        return OrderedDict([('stages', self.stages), ('counters', self.counters)])
+
+class NullProfiler(object):
+    """Profiler recording nothing, used when profiling is disabled."""
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def count(self, name, num=1):
+        return None
+
+    def report(self):
+        return None
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 10:05:51 PM CET
+
+"""Validation of a calibration sheet in one pass, before anything is encoded.
+
+Each violation is reported as an OrderedDict:
+    row: Row number as shown in excel(1-based)
+    column: Name of the column
+    rule: One of RULES
+    message: Description
+"""
+
+from collections import OrderedDict
+
+import xlrd
+from xlrd.sheet import Cell
+from codec import COLUMNS, TYPE_MAP, KEY_DECODERS, VALUE_ENCODERS, RowCodec
+
+RULES = OrderedDict([
+    ('type', "Cell type is not allowed in the column"),
+    ('key', "Key ID is not a hex number of 16 bits"),
+    ('key_order', "Rows of a Key ID are not contiguous"),
+    ('length', "Item length is not an integer of 1 to 65535, or not whole bytes for a string"),
+    ('value', "Value is not a hex number"),
+    ('width', "Value is wider than Item length"),
+    ('bit_group', "Bit fields do not fill whole bytes, or cross a byte boundary"),
+    ('checksum', "Item length of the 1st header row is not the width of the checksum"),
+])
+
+class ValidationError(ValueError):
+    """Raised when a sheet has violations, which are kept in violations."""
+
+    def __init__(self, violations):
+        ValueError.__init__(self, violations)
+        self.violations = violations
+
+    def __str__(self):
+        first = self.violations[0]
+        return "%d violation(s), 1st at row %d, %s: %s" %(len(self.violations), first['row'], first['column'],
+                                                          first['message'])
+
+def check_value(cell, length):
+    """
+    :param cell: Value cell, of a type in VALUE_ENCODERS.
+    :param length: Bit length of the item.
+    :return: Tuple of (rule, message) of the violation, None if valid.
+    """
+    if cell.ctype is xlrd.XL_CELL_NUMBER:
+        if cell.value < 0 or cell.value != int(cell.value):
+            return 'value', "Value %r is not a hex number" %cell.value
+        num = int(str(int(cell.value)), 16)
+    else:
+        value = cell.value.encode("utf-8")
+        if value.startswith('"'):
+            if length % 8 != 0:
+                return 'length', "String value needs Item length of whole bytes, not %d bits" %length
+            if len(value[1:-1]) * 8 > length:
+                return 'width', "Value %s is wider than %d bits" %(value, length)
+            return None
+        try:
+            num = int(value, 16)
+        except ValueError:
+            return 'value', "Value %r is not a hex number" %value
+    if num < 0:
+        return 'value', "Value %r is not a hex number" %cell.value
+    if num.bit_length() > length:
+        return 'width', "Value %X is wider than %d bits" %(num, length)
+    return None
+
+def validate_sheet(sheet, checksum_size=None):
+    """Scan the rows of sheet once, collecting every violation instead of stopping at the first one.
+    Only the five columns exchanger reads are fetched, column by column.
+
+    :param sheet: Calibration sheet.
+    :param checksum_size: Bytes of the checksum filled into the 1st header row, None to not check it.
+    :return: List of violations, sorted by row.
+    """
+    codec = RowCodec(sheet.row_values(1))
+    key_column, length_column, value_column, cali_column, name_column = COLUMNS
+    start = 2
+    end = len(sheet.col(codec.cali_idx)) - 1
+    columns = (codec.key_idx, codec.length_idx, codec.value_idx, codec.cali_idx, codec.name_idx)
+    key_types, length_types, value_types, cali_types, name_types = [sheet.col_types(colx, start, end)
+                                                                    for colx in columns]
+    key_values, length_values, value_values, cali_values, name_values = [sheet.col_values(colx, start, end)
+                                                                         for colx in columns]
+    violations = []
+
+    def report(rowx, column, rule, message):
+        violations.append(OrderedDict([('row', rowx + 1), ('column', column), ('rule', rule),
+                                       ('message', message)]))
+
+    def check_type(rowx, ctype, column, ctypes):
+        if ctype not in ctypes:
+            report(rowx, column, 'type', "Type of %s cell should not be %s" %(column, TYPE_MAP[ctype]))
+            return False
+        return True
+
+    seen_keys = set()
+    last_key = None
+    # Key ID is only decoded when the cell differs from the last one
+    last_cell = None
+    cell_key = None
+    # Bits of the current run of bit fields, the row and the Key Name it starts with
+    pool_bits = 0
+    pool_row = None
+    pool_name = None
+    # 1st header row holds the checksum
+    first_row = True
+    for offset in xrange(len(key_types)):
+        rowx = start + offset
+        ctype = key_types[offset]
+        if ctype is xlrd.XL_CELL_EMPTY:
+            continue
+
+        # Key ID
+        key = None
+        if check_type(rowx, ctype, key_column, KEY_DECODERS):
+            if (ctype, key_values[offset]) != last_cell:
+                last_cell = (ctype, key_values[offset])
+                try:
+                    cell_key = codec.key(Cell(ctype, key_values[offset]))
+                except ValueError:
+                    cell_key = None
+            key = cell_key
+            if key is None:
+                report(rowx, key_column, 'key', "Key ID %r is not a hex number of 16 bits" %key_values[offset])
+        if key is not None and key != last_key:
+            if pool_bits:
+                report(pool_row, length_column, 'bit_group', "Bit fields do not fill whole byte")
+                pool_bits = 0
+            if key in seen_keys:
+                report(rowx, key_column, 'key_order', "Rows of Key ID %04X are not contiguous" %key)
+            seen_keys.add(key)
+            last_key = key
+
+        # Item length
+        length = None
+        if check_type(rowx, length_types[offset], length_column, (xlrd.XL_CELL_NUMBER,)):
+            value = length_values[offset]
+            if value != int(value) or not 0 < value <= 0xFFFF:
+                report(rowx, length_column, 'length', "Item length %r is not an integer of 1 to 65535" %value)
+            else:
+                length = int(value)
+        if first_row:
+            first_row = False
+            if checksum_size is not None and length is not None and length != checksum_size * 8:
+                report(rowx, length_column, 'checksum', "Checksum item is %d bits, while checksum needs %d bits"
+                       %(length, checksum_size * 8))
+        # Header groups bit fields by Key Name, which may change inside one Key ID
+        if pool_bits and name_values[offset] != pool_name:
+            report(pool_row, length_column, 'bit_group',
+                   "Bit fields do not fill whole byte of Key Name %s" %pool_name)
+            pool_bits = 0
+        if length is not None:
+            if length % 8 != 0:
+                if pool_bits == 0:
+                    pool_row = rowx
+                    pool_name = name_values[offset]
+                pool_bits += length
+                if pool_bits > 8:
+                    report(rowx, length_column, 'bit_group', "Bit fields cross byte boundary")
+                    pool_bits = 0
+                elif pool_bits == 8:
+                    pool_bits = 0
+            elif pool_bits:
+                report(pool_row, length_column, 'bit_group', "Bit fields do not fill whole byte")
+                pool_bits = 0
+
+        # Value
+        if check_type(rowx, value_types[offset], value_column, VALUE_ENCODERS) and length is not None:
+            violation = check_value(Cell(value_types[offset], value_values[offset]), length)
+            if violation is not None:
+                report(rowx, value_column, *violation)
+
+        # Calibration Name & Key Name
+        check_type(rowx, cali_types[offset], cali_column, (xlrd.XL_CELL_TEXT,))
+        check_type(rowx, name_types[offset], name_column, (xlrd.XL_CELL_TEXT, xlrd.XL_CELL_EMPTY))
+
+    if pool_bits:
+        report(pool_row, length_column, 'bit_group', "Bit fields do not fill whole byte")
+    violations.sort(key=lambda violation: violation['row'])
+    return violations
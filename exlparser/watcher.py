@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Mon 19 Oct 2026 03:05:21 AM CET
+
+"""Watch mode of exchanger: a long-running process polling the input directory, which reconverts only the
+changed excels on warm worker processes, and serves conversion requests over a local Unix socket.
+The client side only needs the standard library, exchanger(and xlrd) is imported by the daemon.
+
+Start the daemon:
+    python exchanger.py --watch --socket /tmp/exchanger.sock
+Request from build scripts(the reply is a JSON line, the exit status is 1 if any excel is invalid or failed):
+    python watcher.py --socket /tmp/exchanger.sock [convert|status|stop]
+
+Commands:
+    convert: Rescan input directory and convert changed excels, then reply
+    status:  Reply with the state of the last conversion
+    stop:    Stop the daemon
+"""
+
+import os
+import sys
+import time
+import json
+import errno
+import socket
+import select
+import argparse
+import functools
+import multiprocessing
+from collections import OrderedDict
+
+from keymap import parse_key_names
+
+COMMANDS = ('convert', 'status', 'stop')
+# Longest command line read from a client
+MAX_REQUEST_SIZE = 1024
+
+def is_excel(name):
+    return name.endswith(".xlsx") or name.endswith(".xls")
+
+def _convert_guarded(convert, excel_file):
+    """
+    :return: Tuple of (result of convert, None), or (None, error message) if convert raises.
+    """
+    try:
+        return convert(excel_file), None
+    except Exception as error:
+        return None, "%s: %s" %(type(error).__name__, error)
+
+class Watcher(object):
+    """Keeper of the results of all excels in input directory, reconverting an excel when its mtime or size
+    changes. Worker processes are forked once, with xlrd and exchanger already imported."""
+
+    def __init__(self, input_dir, output_dir, convert, jobs=1, cache=None):
+        """
+        :param input_dir: Directory of input excels.
+        :param output_dir: Directory of output files.
+        :param convert: Function converting an excel, see exchanger.convert_excel_checked().
+        :param jobs: Number of worker processes converting changed excels.
+        :param cache: BuildCache evicted after each conversion, None if not used.
+        """
+        # Imported by worker processes before they are forked
+        import exchanger
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.convert = functools.partial(_convert_guarded, convert)
+        self.cache = cache
+        self.pool = multiprocessing.Pool(jobs) if jobs > 1 else None
+        # (mtime, size) of each excel when it was converted
+        self.states = {}
+        # Result of convert(without binary content), or error message, of each excel
+        self.results = {}
+        # Summary of the last refresh which converted or removed any excel
+        self.last = OrderedDict([('converted', []), ('removed', []), ('invalid', []), ('failed', {}),
+                                 ('time', 0.0)])
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def scan(self):
+        """
+        :return: Dict of excel name to (mtime, size).
+        """
+        states = {}
+        for name in os.listdir(self.input_dir):
+            if not is_excel(name):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.input_dir, name))
+            except OSError:
+                continue
+            states[name] = (stat.st_mtime, stat.st_size)
+        return states
+
+    def refresh(self):
+        """Convert excels changed since last refresh, and update output files if any excel changed.
+
+        :return: OrderedDict summary of the refresh: converted, removed, invalid(excels), failed(excel to error
+                 message) and time.
+        """
+        from exchanger import replace_file
+        start_time = time.time()
+        states = self.scan()
+        changed = sorted(name for name, state in states.iteritems() if self.states.get(name) != state)
+        removed = sorted(set(self.states) - set(states))
+        excel_files = [os.path.abspath(os.path.join(self.input_dir, name)) for name in changed]
+        if self.pool is not None and len(excel_files) > 1:
+            results = self.pool.map(self.convert, excel_files)
+        else:
+            results = map(self.convert, excel_files)
+
+        for name, (result, error) in zip(changed, results):
+            print "Converted Excel: %s" %name
+            if error is not None:
+                self.results[name] = error
+                # Binary of last conversion is stale
+                replace_file(self.bin_file(name), None)
+                continue
+            replace_file(self.bin_file(name), None if result[-1] else [result[0]])
+            # Binary content is not kept
+            self.results[name] = (None,) + result[1:]
+        for name in removed:
+            print "Removed Excel: %s" %name
+            del self.results[name]
+            replace_file(self.bin_file(name), None)
+        self.states = states
+        if changed or removed:
+            self.write_outputs()
+            if self.cache is not None:
+                self.cache.evict()
+
+        summary = OrderedDict([('converted', changed), ('removed', removed),
+                               ('invalid', [name for name in sorted(self.results)
+                                            if isinstance(self.results[name], tuple) and self.results[name][-1]]),
+                               ('failed', dict((name, result) for name, result in self.results.iteritems()
+                                               if isinstance(result, basestring))),
+                               ('time', time.time() - start_time)])
+        # Polls finding nothing changed do not hide the last conversion from status
+        if changed or removed:
+            self.last = summary
+        return summary
+
+    def bin_file(self, name):
+        return os.path.join(self.output_dir, name[:name.index('.')] + '.bin')
+
+    def write_outputs(self):
+        """Rewrite header file and files made from all excels, each replaced atomically."""
+        from exchanger import HEADER_FILE_NAME, replace_file, write_run_files
+        headers = []
+        key_names = []
+        decoders = []
+        invalid = OrderedDict()
+        for name in sorted(self.results):
+            result = self.results[name]
+            if isinstance(result, basestring):
+                continue
+            bin_content, header_content, names_content, decoders_content, report, violations = result
+            if violations:
+                invalid[name] = violations
+                continue
+            headers.append(header_content)
+            key_names.append(parse_key_names(names_content))
+            decoders.append((name, decoders_content))
+        replace_file(os.path.join(self.output_dir, HEADER_FILE_NAME), headers if headers else None)
+        write_run_files(self.output_dir, key_names, decoders, invalid)
+
+    def handle(self, connection):
+        """Serve one request.
+
+        :param connection: Connected socket of a client.
+        :return: False if the daemon is requested to stop.
+        """
+        connection.settimeout(1.0)
+        command = None
+        try:
+            request = ''
+            while '\n' not in request and len(request) < MAX_REQUEST_SIZE:
+                data = connection.recv(MAX_REQUEST_SIZE)
+                if not data:
+                    break
+                request += data
+            command = request.strip() or 'convert'
+            if command == 'convert':
+                reply = self.refresh()
+            elif command in COMMANDS:
+                reply = self.last
+            else:
+                reply = OrderedDict([('error', "Unknown command %r" %command)])
+            connection.sendall(json.dumps(reply) + '\n')
+        except socket.error as error:
+            print "Request failed: %s" %error
+        finally:
+            connection.close()
+        return command != 'stop'
+
+    def serve(self, socket_path=None, interval=1.0):
+        """Poll input directory every interval seconds until stopped, serving requests on socket_path.
+
+        :param socket_path: Path of the Unix socket, None to only poll.
+        :param interval: Seconds between polls.
+        :return: None
+        """
+        server = None
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(socket_path)
+            server.listen(8)
+        try:
+            self.refresh()
+            print "Watching %s..." %self.input_dir
+            next_poll = time.time() + interval
+            while True:
+                timeout = max(0.0, next_poll - time.time())
+                if server is not None:
+                    try:
+                        readable = select.select([server], [], [], timeout)[0]
+                    except select.error as error:
+                        if error.args[0] != errno.EINTR:
+                            raise
+                        readable = []
+                    if readable and not self.handle(server.accept()[0]):
+                        break
+                else:
+                    time.sleep(timeout)
+                if time.time() >= next_poll:
+                    self.refresh()
+                    next_poll = time.time() + interval
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if server is not None:
+                server.close()
+                os.remove(socket_path)
+            self.close()
+        return None
+
+def request(socket_path, command='convert', timeout=None):
+    """Send a request to the daemon.
+
+    :param socket_path: Path of the Unix socket of the daemon.
+    :param command: One of COMMANDS.
+    :param timeout: Seconds to wait for the reply, None to wait till replied.
+    :return: Reply(dict).
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(socket_path)
+        client.sendall(command + '\n')
+        reply = ''
+        while not reply.endswith('\n'):
+            data = client.recv(65536)
+            if not data:
+                break
+            reply += data
+    finally:
+        client.close()
+    return json.loads(reply)
+
+#-----------------------------------
+#               Main
+#-----------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a request to exchanger running in watch mode.")
+    parser.add_argument("command", nargs="?", choices=COMMANDS, default="convert",
+                        help="Request (default: convert)")
+    parser.add_argument("--socket", required=True, help="Unix socket of the daemon")
+    parser.add_argument("--timeout", type=float, help="Seconds to wait for the reply (default: no limit)")
+    args = parser.parse_args()
+
+    try:
+        reply = request(args.socket, args.command, args.timeout)
+    except socket.error as error:
+        sys.exit("Failed to reach daemon at %s: %s" %(args.socket, error))
+    print json.dumps(reply)
+    sys.exit(1 if reply.get('invalid') or reply.get('failed') or 'error' in reply else 0)
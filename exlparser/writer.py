@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+#-*- coding=utf-8 -*-
+# Author: Zhaoting Weng
+# Created Time: Sun 18 Oct 2026 01:35:02 PM CET
+
+import struct
+
+from checksums import Sum16, new_checksum, DEFAULT_CHECKSUM
+
+# Packers of checksum by its byte size
+CHECKSUM_PACKERS = {2: struct.Struct('>H'), 4: struct.Struct('>I')}
+# KEY(2 bytes) & LENGTH(2 bytes) of a fragment
+KEY_LENGTH = struct.Struct('>HH')
+# Entry of key directory: KEY(2 bytes), OFFSET of value(4 bytes), SIZE of value in bytes(2 bytes)
+DIRECTORY_ENTRY = struct.Struct('>HIH')
+# Trailer of key directory: END offset of records(4 bytes), COUNT of entries(4 bytes), MAGIC(4 bytes)
+DIRECTORY_TRAILER = struct.Struct('>II4s')
+DIRECTORY_MAGIC = 'KDIR'
+class BinWriter(object):
+    """Writer assembling binary file content in one growing bytearray.
+
+    Binary file format:
+    |Value of 1st fragment(header, starting with checksum)|KEY(2 bytes)|LENGTH(2 bytes)|VALUE|...
+
+    Indexed binary file format appends a key directory after the records, see write_directory():
+    ...|VALUE|padding to 4 bytes|ENTRY|...|ENTRY|TRAILER|
+    """
+
+    def __init__(self, checksum=DEFAULT_CHECKSUM, header=True):
+        """
+        :param checksum: Name of checksum algorithm, see checksums.CHECKSUM_ALGORITHMS.
+        :param header: Whether the 1st written fragment is the header. A writer without header assembles a chunk of
+                       records, to be appended to another writer by extend().
+        """
+        self.buffer = bytearray()
+        self.header = header
+        self.header_size = 0
+        # Checksum accumulator, fed with bytes after the checksum as they are written
+        self.checksum = new_checksum(checksum)
+        self._fed = self.checksum.size if header else 0
+
+    @classmethod
+    def restore(cls, checksum, content, header=True, state=None):
+        """Rebuild a writer having written content, e.g. the records of a key group kept by an index.
+
+        :param checksum: Name of checksum algorithm.
+        :param content: Content written, which is only the header if header is True.
+        :param header: Whether content is the header.
+        :param state: State of the Sum16 accumulator fed with content(see Sum16.state()), None to feed content
+                      again.
+        :return: BinWriter.
+        """
+        writer = cls(checksum, header)
+        writer.buffer += content
+        if header:
+            writer.header_size = len(writer.buffer)
+        if state is not None and isinstance(writer.checksum, Sum16):
+            writer.checksum = Sum16.from_state(state)
+            writer._fed = len(writer.buffer)
+        return writer
+
+    def _feed(self):
+        """Feed bytes written since last feed to checksum accumulator."""
+        if len(self.buffer) > self._fed:
+            self.checksum.update(memoryview(self.buffer)[self._fed:])
+            self._fed = len(self.buffer)
+
+    def write_fragments(self, fragments):
+        """Append merged fragments, stripping length & keyid infos of the 1st fragment.
+
+        :param fragments: List of merged fragment.
+        :return: None
+        """
+        buf = self.buffer
+        if self.header and not buf and fragments:
+            buf += fragments[0][2]
+            self.header_size = len(buf)
+            fragments = fragments[1:]
+        for key_bin, length_bin, value_bin in fragments:
+            buf += key_bin
+            buf += length_bin
+            buf += value_bin
+        self._feed()
+        return None
+
+    def write_table(self, table):
+        """Append merged fragments of FragmentTable, stripping length & keyid infos of the 1st fragment.
+
+        :param table: Merged FragmentTable.
+        :return: None
+        """
+        buf = self.buffer
+        keys, lengths, offsets, values = table.keys, table.lengths, table.offsets, memoryview(table.values)
+        start = 0
+        if self.header and not buf and len(table):
+            buf += values[offsets[0]:offsets[1]]
+            self.header_size = len(buf)
+            start = 1
+        for index in xrange(start, len(table)):
+            if lengths[index] > 0xFFFF:
+                raise ValueError("Bit-length of Key ID %04X is wider than 16 bits" %keys[index])
+            buf += KEY_LENGTH.pack(keys[index], lengths[index])
+            buf += values[offsets[index]:offsets[index+1]]
+        self._feed()
+        return None
+
+    def extend(self, other):
+        """Append content of a writer without header. Its checksum accumulator is combined when the algorithm
+        supports it, otherwise the appended bytes are fed again.
+
+        :param other: BinWriter without header, of the same checksum algorithm.
+        :return: None
+        """
+        self._feed()
+        self.buffer += other.buffer
+        if hasattr(self.checksum, 'combine') and other._fed == len(other.buffer):
+            self.checksum.combine(other.checksum)
+            self._fed = len(self.buffer)
+        else:
+            self._feed()
+        return None
+
+    def write_directory(self):
+        """Append a directory of the written records sorted by Key ID, for looking up a key by binary search. It
+        is covered by checksum, so call it after all records are written and before fill_checksum().
+
+        Directory is aligned to 4 bytes, each ENTRY is (KEY, OFFSET, SIZE) of a record's value, the TRAILER at the
+        end of file is (END offset of records, COUNT of entries, 'KDIR').
+
+        :return: Number of entries.
+        """
+        buf = self.buffer
+        end = len(buf)
+        entries = []
+        offset = self.header_size
+        while offset < end:
+            key, length = KEY_LENGTH.unpack_from(buf, offset)
+            offset += KEY_LENGTH.size
+            size = (length + 7) / 8
+            entries.append((key, offset, size))
+            offset += size
+        entries.sort()
+        buf += '\x00' * (-end % 4)
+        for entry in entries:
+            buf += DIRECTORY_ENTRY.pack(*entry)
+        buf += DIRECTORY_TRAILER.pack(end, len(entries), DIRECTORY_MAGIC)
+        self._feed()
+        return len(entries)
+
+    def fill_checksum(self):
+        """Fill in checksum of all bytes after the checksum, by default 16-bit two's complement of their sum.
+
+        :return: Checksum
+        """
+        if len(self.buffer) < self.checksum.size:
+            raise ValueError("Header is shorter than %d-byte checksum" %self.checksum.size)
+        self._feed()
+        if isinstance(self.checksum, Sum16) and self.checksum.count % 2 != 0:
+            print "WARNING: byte counts for checksum is not even"
+        check_sum = self.checksum.digest()
+        CHECKSUM_PACKERS[self.checksum.size].pack_into(self.buffer, 0, check_sum)
+        return check_sum